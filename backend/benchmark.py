@@ -0,0 +1,58 @@
+import sys
+import timeit
+from flaskr import create_app, paginate, paginate_query, project, serialize, QUESTION_FIELDS
+from models import db, Question
+
+
+def bench(name, function, rows, number):
+    """Prints the throughput of a function in rows per second.
+
+    Args:
+        name (str): Name of the benchmark.
+        function (function): Function to benchmark.
+        rows (int): Number of rows processed by each call.
+        number (int): Number of calls.
+    """
+
+    def run():
+        function()
+        # Clearing the session so every call starts with an empty identity map.
+        db.session.remove()
+
+    seconds = timeit.timeit(run, number=number)
+    print(f'{name:<32}{rows * number / seconds:>14,.0f} rows/s')
+
+
+def main(number=20):
+    """Compares the ORM read path against the projected read path.
+
+    Run against the configured database with `python benchmark.py [number]`.
+
+    Args:
+        number (int, optional): Number of calls per benchmark. Defaults to 20.
+    """
+
+    app = create_app()
+
+    with app.test_request_context('/questions?page=1'):
+        from flask import request
+
+        total = Question.query.count()
+        page = len(paginate_query(request, Question.query, QUESTION_FIELDS))
+
+        bench('orm: all rows',
+              lambda: [question.to_json() for question in Question.query.all()],
+              total, number)
+        bench('projection: all rows',
+              lambda: serialize(project(Question.query, QUESTION_FIELDS).all(), QUESTION_FIELDS),
+              total, number)
+        bench('orm: paginate()',
+              lambda: paginate(request, Question.query.all()),
+              page, number)
+        bench('projection: paginate_query()',
+              lambda: paginate_query(request, Question.query, QUESTION_FIELDS),
+              page, number)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -1,11 +1,31 @@
-import sys
-import random
-from flask import Flask, request, abort, jsonify
+import time
+import uuid
+from flask import Flask, Response, g, has_app_context, request, abort, jsonify
 from flask_cors import CORS
+from sqlalchemy import event, func
+from sqlalchemy.engine import Engine
+from werkzeug.exceptions import Conflict
 from models import setup_db, Question, Category
+from .answers import (AnswerKeyCache, KnownAnswers, backfill_answer_keys, is_correct,
+                      make_answer_keys)
+from .cache import ResponseCache
+from .coalesce import SingleFlight
+from .dedupe import LSHIndex, backfill_signatures, encode_signature, find_duplicates, make_signature
+from .events import EventBroker
+from .leaderboard import Leaderboards
+from .logs import setup_logging
+from .ratelimit import RateLimiter
+from .shuffle import permute
 
 
 RESULTS_PER_PAGE = 10
+LEADERBOARD_SIZE = 10
+QUIZ_BATCH_SIZE = 20
+QUESTION_FIELDS = ('id', 'question', 'answer', 'category', 'difficulty')
+
+# Rate limits as (requests per second, burst capacity) per client.
+READ_RATE_LIMIT = (10, 50)
+WRITE_RATE_LIMIT = (2, 10)
 
 
 def paginate(request, selection):
@@ -29,6 +49,125 @@ def paginate(request, selection):
     return current_selection
 
 
+def get_fields(fields):
+    """Utility function to validate the question fields requested by a client.
+
+    Args:
+        fields (str or list): Comma separated string or list of field names.
+        Defaults to all fields if None.
+
+    Returns:
+        tuple: Requested field names in the order of QUESTION_FIELDS.
+
+    Errors:
+        400: Raised if a field name is not one of QUESTION_FIELDS.
+    """
+
+    if fields is None:
+        return QUESTION_FIELDS
+
+    if isinstance(fields, str):
+        fields = fields.split(',')
+
+    if not isinstance(fields, list) or not fields or any(
+            field not in QUESTION_FIELDS for field in fields):
+        abort(400)
+
+    return tuple(field for field in QUESTION_FIELDS if field in fields)
+
+
+def project(query, fields):
+    """Utility function to select only the requested question columns,
+    skipping ORM object hydration.
+
+    Args:
+        query (flask_sqlalchemy.BaseQuery): Query of questions.
+        fields (tuple): Field names to select.
+
+    Returns:
+        flask_sqlalchemy.BaseQuery: Query returning tuples of the columns.
+    """
+
+    return query.with_entities(*(getattr(Question, field) for field in fields))
+
+
+def serialize(rows, fields):
+    """Utility function to serialize projected rows.
+
+    Args:
+        rows (list): Tuples returned by a projected query.
+        fields (tuple): Field names of the tuples.
+
+    Returns:
+        list: Dicts of the rows.
+    """
+
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def paginate_query(request, query, fields):
+    """Utility function to provide paginated results, selecting only the
+    current page and the requested columns from the database.
+
+    Args:
+        request (flask.request): Flask request received by the route.
+        query (flask_sqlalchemy.BaseQuery): Query of questions.
+        fields (tuple): Field names to select.
+
+    Returns:
+        list: Paginated results of query.
+    """
+
+    page = request.args.get('page', 1, type=int)
+    if page < 1:
+        return []
+
+    start = (page - 1) * RESULTS_PER_PAGE
+
+    rows = project(query, fields).order_by(
+        Question.id).offset(start).limit(RESULTS_PER_PAGE).all()
+
+    return serialize(rows, fields)
+
+
+# NOTE: Listening on the Engine class rather than an instance, so the DB time of
+# a request is measured whichever engine the app is bound to when it runs. The
+# start time is kept on the execution context, which is discarded whether the
+# statement succeeds or fails.
+@event.listens_for(Engine, 'before_cursor_execute')
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context.query_start = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    add_db_time(context)
+
+
+@event.listens_for(Engine, 'handle_error')
+def handle_error(exception_context):
+    if exception_context.execution_context is not None:
+        add_db_time(exception_context.execution_context)
+
+
+def add_db_time(context):
+    start = getattr(context, 'query_start', None)
+    if start is not None and has_app_context() and 'db_time' in g:
+        g.db_time += time.perf_counter() - start
+
+
+def log_fields():
+    """Utility function to provide the fields identifying the current request
+    in a log record.
+
+    Returns:
+        dict: Extra fields of a log record.
+    """
+
+    return {'fields': {'request_id': getattr(g, 'request_id', None),
+                       'route': request.url_rule.rule if request.url_rule else request.path}}
+
+
 def create_app(test_config=None):
     """Creates a Flask app and its routes.
 
@@ -40,8 +179,67 @@ def create_app(test_config=None):
     """
 
     app = Flask(__name__)
+    if test_config is not None:
+        app.config.from_pyfile(test_config)
     setup_db(app)
 
+    # NOTE: The rate limit backend can be swapped for a shared one by setting
+    # RATE_LIMIT_BACKEND in the configuration file. Clients sending one of
+    # API_KEYS in the X-API-Key header are limited per key.
+    limiter = RateLimiter(app.config.get('RATE_LIMIT_BACKEND'),
+                          app.config.get('API_KEYS', ()))
+    single_flight = SingleFlight()
+
+    # NOTE: Responses are cached in memory by default. Set RESPONSE_CACHE_BACKEND
+    # to a FileCacheBackend to share the cache between worker processes.
+    response_cache = ResponseCache(app.config.get('RESPONSE_CACHE_BACKEND'))
+    app.extensions['response_cache'] = response_cache
+
+    answer_key_cache = AnswerKeyCache()
+
+    # NOTE: Keys of all answers, so that a guess matching another answer is
+    # not taken for a typo without querying the database.
+    known_answers = KnownAnswers()
+    known_answers.init_app(app)
+    app.extensions['known_answers'] = known_answers
+    leaderboards = Leaderboards()
+    leaderboards.init_app(app)
+    app.extensions['leaderboards'] = leaderboards
+    question_events = EventBroker()
+
+    # NOTE: The duplicate index is built once on start up and kept up to date by
+    # Question.insert and Question.delete, and by a background refresh for
+    # changes made by other processes.
+    question_index = LSHIndex()
+    question_index.init_app(app)
+    app.extensions['question_index'] = question_index
+
+    @app.cli.command('backfill-signatures')
+    def backfill_signatures_command():
+        """Saves the duplicate detection signatures of questions that have
+        none stored, e.g. questions added before the signature column.
+        """
+
+        print(f'Saved {backfill_signatures()} signatures')
+
+    @app.cli.command('backfill-answer-keys')
+    def backfill_answer_keys_command():
+        """Saves the normalized answer keys of questions that have none
+        stored, e.g. questions added before the answer_keys column.
+        """
+
+        print(f'Saved the answer keys of {backfill_answer_keys()} questions')
+
+    logger = setup_logging()
+
+    @app.before_request
+    def before_request():
+        """Runs before every request, starting the timers of its access log."""
+
+        g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+        g.request_start = time.perf_counter()
+        g.db_time = 0.0
+
     '''
     @ [DONE] TODO:
         Set up CORS. Allow '*' for origins. Delete the sample route after
@@ -69,6 +267,18 @@ def create_app(test_config=None):
         response.headers.add('Access-Control-Allow-Headers',
                              'GET, POST, PATCH, DELETE, OPTION')
 
+        if 'request_start' in g:
+            response.headers['X-Request-ID'] = g.request_id
+
+            fields = log_fields()
+            fields['fields'].update({
+                'method': request.method,
+                'status': response.status_code,
+                'latency_ms': round((time.perf_counter() - g.request_start) * 1000, 3),
+                'db_ms': round(g.db_time * 1000, 3)
+            })
+            logger.info('access', extra=fields)
+
         return response
 
     '''
@@ -77,6 +287,9 @@ def create_app(test_config=None):
         categories.
     '''
     @app.route('/categories')
+    @limiter.limit(*READ_RATE_LIMIT)
+    @response_cache.cached
+    @single_flight.coalesce
     def get_categories():
         """Gets all Categories.
 
@@ -114,9 +327,16 @@ def create_app(test_config=None):
         Clicking on the page numbers should update the questions.
     '''
     @app.route('/questions')
+    @limiter.limit(*READ_RATE_LIMIT)
+    @response_cache.cached
+    @single_flight.coalesce
     def get_questions():
         """Gets paginated questions.
 
+        Args:
+            fields (str, optional): Comma separated question fields to return.
+            Defaults to all fields.
+
         Returns:
             json: {
                 'success': bool,
@@ -127,21 +347,25 @@ def create_app(test_config=None):
             }
 
         Errors:
+            400: Returned if an unknown field is requested.
             404: Returned if no questions are found.
         """
 
-        questions = Question.query.all()
-        paginated_questions = paginate(request, questions)
+        fields = get_fields(request.args.get('fields'))
+        paginated_questions = paginate_query(request, Question.query, fields)
 
         if len(paginated_questions) == 0:
             abort(404)
 
+        categories = dict(Category.query.with_entities(
+            Category.id, Category.type).all())
+
         return jsonify({
             'success': True,
-            'categories': {category.id: category.type for category in Category.query.all()},
+            'categories': categories,
             'current_category': None,
             'questions': paginated_questions,
-            'total_questions': len(questions)
+            'total_questions': Question.query.count()
         })
 
     '''
@@ -152,6 +376,7 @@ def create_app(test_config=None):
         This removal will persist in the database and when you refresh the page.
     '''
     @app.route('/questions/<int:question_id>', methods=['DELETE'])
+    @limiter.limit(*WRITE_RATE_LIMIT)
     def delete_question(question_id):
         """Deletes a question by id.
 
@@ -177,6 +402,9 @@ def create_app(test_config=None):
 
         try:
             question.delete()
+            answer_key_cache.discard(question_id)
+            question_events.publish(
+                'deleted', question_id=question_id, category=question.category)
 
             return jsonify({
                 'success': True,
@@ -184,7 +412,7 @@ def create_app(test_config=None):
             })
 
         except:
-            print(sys.exc_info())
+            logger.exception('failed to delete question', extra=log_fields())
             abort(422)
 
     '''
@@ -198,6 +426,7 @@ def create_app(test_config=None):
         of the questions list in the "List" tab.
     '''
     @app.route('/questions', methods=['POST'])
+    @limiter.limit(*WRITE_RATE_LIMIT)
     def create_question():
         """Creates a new question.
 
@@ -206,6 +435,9 @@ def create_app(test_config=None):
             answer (str): Answer to the question.
             difficulty (int): Value of difficulty.
             category (int): Id of category.
+            aliases (list, optional): Alternative accepted answers.
+            allow_duplicate (bool, optional): Whether to create the question
+            even if a near-duplicate exists. Defaults to False.
 
         Returns:
             json: {
@@ -214,17 +446,43 @@ def create_app(test_config=None):
             }
 
         Errors:
+            409: Returned if a near-duplicate of the question exists.
             422: Returned if the request was unprocessable.
         """
 
         body = request.get_json()
 
+        text = body.get('question') if body.get('question') != '' else None
+        answer = body.get('answer') if body.get('answer') != '' else None
+        aliases = body.get('aliases', [])
+
+        if not isinstance(aliases, list) or not all(isinstance(alias, str) for alias in aliases):
+            abort(422)
+
+        try:
+            answer_keys = make_answer_keys(
+                answer, aliases) if isinstance(answer, str) else None
+        except ValueError:
+            abort(422)
+
+        signature = make_signature(text) if isinstance(text, str) else None
+
+        if signature is not None and not body.get('allow_duplicate', False):
+            duplicates = question_index.query(signature)
+
+            if len(duplicates):
+                error = Conflict()
+                error.duplicates = [question_id for question_id, _ in duplicates]
+                raise error
+
         question = Question(
-            question=body.get('question') if body.get(
-                'question') != '' else None,
-            answer=body.get('answer') if body.get('answer') != '' else None,
+            question=text,
+            answer=answer,
             difficulty=body.get('difficulty', None),
-            category=body.get('category', None)
+            category=body.get('category', None),
+            answer_keys=answer_keys,
+            signature=encode_signature(
+                signature) if signature is not None else None
         )
 
         # Not checking for empty values explicitly. Instead updated model to not allow
@@ -233,6 +491,8 @@ def create_app(test_config=None):
 
         try:
             question.insert()
+            question_events.publish(
+                'created', question_id=question.id, category=question.category)
 
             return jsonify({
                 'success': True,
@@ -240,9 +500,103 @@ def create_app(test_config=None):
             })
 
         except:
-            print(sys.exc_info())
+            logger.exception('failed to create question', extra=log_fields())
+            abort(422)
+
+    @app.route('/questions/duplicates')
+    @limiter.limit(*WRITE_RATE_LIMIT)
+    def get_duplicate_questions():
+        """Reports all pairs of near-duplicate questions.
+
+        Returns:
+            json: {
+                'success': bool,
+                'duplicates': list,
+                'total_questions': int
+            }
+        """
+
+        duplicates, total_questions = find_duplicates()
+
+        return jsonify({
+            'success': True,
+            'duplicates': [{
+                'question_ids': [question_id, duplicate_id],
+                'similarity': score
+            } for question_id, duplicate_id, score in duplicates],
+            'total_questions': total_questions
+        })
+
+    @app.route('/questions/stream')
+    @limiter.limit(*READ_RATE_LIMIT)
+    def stream_question_events():
+        """Streams changes to the questions as Server-Sent Events.
+
+        Events:
+            created: {'type': str, 'id': int, 'question_id': int, 'category': int}
+            deleted: {'type': str, 'id': int, 'question_id': int, 'category': int}
+            reset: Sent if the client fell behind and events were dropped, or
+            missed events while reconnecting, so the client should re-fetch
+            the questions.
+
+        Returns:
+            Response: text/event-stream response.
+        """
+
+        return Response(question_events.stream(request.headers.get('Last-Event-ID')),
+                        mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache',
+                                 'X-Accel-Buffering': 'no'})
+
+    @app.route('/questions/<int:question_id>/answer', methods=['POST'])
+    @limiter.limit(*READ_RATE_LIMIT)
+    def check_answer(question_id):
+        """Checks an answer to a question, tolerating differences in case,
+        accents and punctuation as well as small typos.
+
+        Args:
+            question_id (int): Id of the question to answer.
+            answer (str): Answer given by the player.
+
+        Returns:
+            json: {
+                'success': bool,
+                'correct': bool,
+                'answer': str
+            }
+
+        Errors:
+            404: Returned if question with specified id is not found.
+            422: Returned if no answer is provided.
+        """
+
+        body = request.get_json()
+        guess = body.get('answer')
+
+        if not isinstance(guess, str):
             abort(422)
 
+        entry = answer_key_cache.get(question_id)
+        if entry is None:
+            entry = Question.query.with_entities(
+                Question.answer, Question.answer_keys).filter(
+                Question.id == question_id).one_or_none()
+
+            if entry is None:
+                abort(404)
+
+            answer, answer_keys = entry
+            entry = (answer, answer_keys or make_answer_keys(answer))
+            answer_key_cache.set(question_id, entry)
+
+        answer, answer_keys = entry
+
+        return jsonify({
+            'success': True,
+            'correct': is_correct(guess, answer_keys, known_answers.__contains__),
+            'answer': answer
+        })
+
     '''
     @ [DONE] TODO:
         Create a POST endpoint to get questions based on a search term.
@@ -254,11 +608,14 @@ def create_app(test_config=None):
         Try using the word "title" to start.
     '''
     @app.route('/questions/search', methods=['POST'])
+    @limiter.limit(*READ_RATE_LIMIT)
     def search_questions():
         """Searches all questions using the search term provided.
 
         Args:
             searchTerm (str): Term to filter results by.
+            fields (list, optional): Question fields to return. Defaults to
+            all fields.
 
         Returns:
             json: {
@@ -269,6 +626,7 @@ def create_app(test_config=None):
             }
 
         Errors:
+            400: Returned if an unknown field is requested.
             404: Returned if no questions were found with the search
             term provided.
             422: If no search term is provided.
@@ -279,9 +637,10 @@ def create_app(test_config=None):
         if not body.get("searchTerm"):
             abort(422)
 
+        fields = get_fields(body.get('fields'))
         questions = Question.query.filter(
-            Question.question.ilike('%{}%'.format(body.get("searchTerm")))).all()
-        paginated_questions = paginate(request, questions)
+            Question.question.ilike('%{}%'.format(body.get("searchTerm"))))
+        paginated_questions = paginate_query(request, questions, fields)
 
         if len(paginated_questions) == 0:
             abort(404)
@@ -290,7 +649,7 @@ def create_app(test_config=None):
             'success': True,
             'current_category': None,
             'questions': paginated_questions,
-            'total_questions': len(questions)
+            'total_questions': questions.count()
         })
 
     '''
@@ -302,11 +661,16 @@ def create_app(test_config=None):
         category to be shown.
     '''
     @app.route('/categories/<int:category_id>/questions')
+    @limiter.limit(*READ_RATE_LIMIT)
+    @response_cache.cached
+    @single_flight.coalesce
     def get_questions_by_category(category_id):
         """Gets all questions for a specified category.
 
         Args:
             id (int): Id of the category to get questions for.
+            fields (str, optional): Comma separated question fields to return.
+            Defaults to all fields.
 
         Returns:
             json: {
@@ -317,13 +681,14 @@ def create_app(test_config=None):
             }
 
         Errors:
+            400: Returned if an unknown field is requested.
             404: Returned if no questions were found for the
             category.
         """
 
-        questions = Question.query.filter(
-            Question.category == category_id).all()
-        paginated_questions = paginate(request, questions)
+        fields = get_fields(request.args.get('fields'))
+        questions = Question.query.filter(Question.category == category_id)
+        paginated_questions = paginate_query(request, questions, fields)
 
         if len(paginated_questions) == 0:
             abort(404)
@@ -332,7 +697,7 @@ def create_app(test_config=None):
             'success': True,
             'current_category': category_id,
             'questions': paginated_questions,
-            'total_questions': len(questions)
+            'total_questions': questions.count()
         })
 
     '''
@@ -347,58 +712,308 @@ def create_app(test_config=None):
         and shown whether they were correct or not.
     '''
     @app.route('/quizzes', methods=['POST'])
+    @limiter.limit(*READ_RATE_LIMIT)
     def get_next_unanswered_question():
         """Get next available unanswered question for a specific category
         or all categories.
 
+        If a seed is provided, the question is instead picked from a seeded
+        permutation of the category's questions, so every position of the
+        quiz maps to a distinct question without tracking previous ones.
+
+        If a count is provided, up to that many distinct questions are
+        returned at once, so a whole round can be played from one response.
+
         Args:
             quiz_category (dict): Dict of current category.
             previous_questions (list): List of ids for previous questions.
+            seed (int, optional): Seed of the question permutation.
+            position (int, optional): Position within the permutation.
+            Defaults to 0.
+            version (str, optional): Version of the category's questions
+            returned for the first position of a seeded quiz.
+            fields (list, optional): Question fields to return, e.g. to leave
+            out the answer. Defaults to all fields.
+            count (int, optional): Number of questions to return, up to
+            QUIZ_BATCH_SIZE.
 
         Returns:
             json: {
                 'success': bool,
-                'question': str or None
+                'question': str or None,
+                'questions': list (only if count was provided),
+                'remaining_questions': int (only if count was provided)
             }
 
         Errors:
+            400: Returned if an unknown field is requested.
+            409: Returned if the questions of a seeded quiz changed since the
+            version provided.
             422: Returned if category or previous_questions were not provided
-            in the request body.
+            in the request body, previous_questions is not a list of ids, or
+            count is invalid.
         """
 
         body = request.get_json()
 
         category = body.get('quiz_category', None)
         previous_questions = body.get('previous_questions', None)
+        count = body.get('count', None)
 
         if category is None:
             abort(422)
 
+        if previous_questions is not None and (
+                not isinstance(previous_questions, list) or
+                not all(type(question_id) is int for question_id in previous_questions)):
+            abort(422)
+
+        if count is not None and (not isinstance(count, int) or not 1 <= count <= QUIZ_BATCH_SIZE):
+            abort(422)
+
+        fields = get_fields(body.get('fields'))
+
+        if body.get('seed') is not None:
+            return get_seeded_question(
+                category['id'], body.get('seed'), body.get('position', 0), fields, count,
+                body.get('version'))
+
         # NOTE: Thought about using the existing API functions such as get_questions
         # and get_questions_by_category, but these are returned paginated, so these
         # functions would need to be enhanced to support providing full results
         # without pagination. Stuck to just creating a new query.
         category_id = category['id']
+        questions = Question.query
         if category_id:
-            questions = [question.to_json() for question in Question.query.filter(
-                Question.category == category_id).all()]
-        else:
-            questions = [question.to_json()
-                         for question in Question.query.all()]
+            questions = questions.filter(Question.category == category_id)
+        if previous_questions:
+            questions = questions.filter(~Question.id.in_(previous_questions))
 
-        unanswered_questions = [
-            question for question in questions if question['id'] not in previous_questions]
+        # Picking the random questions in the database, so only the returned rows
+        # are fetched. The window function counts all unanswered questions in the
+        # same query.
+        rows = project(questions, fields).add_columns(func.count().over()).order_by(
+            func.random()).limit(count or 1).all()
 
-        if len(unanswered_questions):
-            return jsonify({
-                'success': True,
-                'question': random.choice(unanswered_questions)
-            })
-        else:
-            return jsonify({
-                'success': True,
-                'question': None
-            })
+        unanswered_questions = serialize([row[:-1] for row in rows], fields)
+
+        response = {
+            'success': True,
+            'question': unanswered_questions[0] if len(unanswered_questions) else None
+        }
+
+        if count is not None:
+            response['questions'] = unanswered_questions
+            response['remaining_questions'] = rows[0][-1] - len(rows) if len(rows) else 0
+
+        return jsonify(response)
+
+    def get_seeded_question(category_id, seed, position, fields, count=None, version=None):
+        """Gets the question at a position of a seeded quiz.
+
+        The permutation is over the category's questions ordered by id, so
+        adding or deleting a question changes which question every position
+        maps to. The returned version identifies the questions a quiz was
+        started with, and requests for a different version are rejected.
+
+        Args:
+            category_id (int): Id of the category, or 0 for all categories.
+            seed (int): Seed of the question permutation.
+            position (int): Position within the permutation.
+            fields (tuple): Question fields to return.
+            count (int, optional): Number of consecutive positions to return.
+            version (str, optional): Version returned for an earlier position.
+
+        Returns:
+            json: {
+                'success': bool,
+                'question': dict or None,
+                'questions': list (only if count was provided),
+                'position': int,
+                'total_questions': int,
+                'version': str
+            }
+
+        Errors:
+            409: Returned if the questions changed since version.
+            422: Returned if seed or position are not integers.
+        """
+
+        if not isinstance(seed, int) or not isinstance(position, int) or position < 0:
+            abort(422)
+
+        query = Question.query
+        if category_id:
+            query = query.filter(Question.category == category_id)
+
+        # Ids only grow, so the number and sum of the ids change whenever a
+        # question is added or deleted.
+        total_questions, id_sum = query.with_entities(
+            func.count(Question.id), func.coalesce(func.sum(Question.id), 0)).one()
+        current_version = f'{total_questions}.{id_sum}'
+
+        if version is not None and version != current_version:
+            abort(409)
+
+        indices = [permute(current, total_questions, seed)
+                   for current in range(position, min(position + (count or 1), total_questions))]
+
+        questions = []
+        if len(indices):
+            # Numbering the questions by id, so all positions are fetched in a
+            # single query.
+            numbered = query.with_entities(
+                Question.id.label('id'),
+                (func.row_number().over(order_by=Question.id) - 1).label('permutation_index')).subquery()
+            rows = project(Question.query.join(numbered, Question.id == numbered.c.id), fields).add_columns(
+                numbered.c.permutation_index).filter(numbered.c.permutation_index.in_(indices)).all()
+
+            by_index = {row[-1]: dict(zip(fields, row[:-1])) for row in rows}
+            questions = [by_index[index] for index in indices if index in by_index]
+
+        response = {
+            'success': True,
+            'question': questions[0] if len(questions) else None,
+            'position': position,
+            'total_questions': total_questions,
+            'version': current_version
+        }
+
+        if count is not None:
+            response['questions'] = questions
+
+        return jsonify(response)
+
+    @app.route('/scores', methods=['POST'])
+    @limiter.limit(*WRITE_RATE_LIMIT)
+    def add_score():
+        """Adds the score of a quiz to the total of a player.
+
+        Args:
+            player (str): Name of the player.
+            quiz_category (dict): Dict of the category played.
+            score (int): Number of correct answers.
+
+        Returns:
+            json: {
+                'success': bool,
+                'player': str,
+                'score': int,
+                'rank': int
+            }
+
+        Errors:
+            422: Returned if player, quiz_category or score are invalid or
+            the category does not exist.
+        """
+
+        body = request.get_json()
+
+        player = body.get('player')
+        category = body.get('quiz_category', None)
+        score = body.get('score')
+
+        if not isinstance(player, str) or not player.strip() or category is None:
+            abort(422)
+
+        if not isinstance(score, int) or score < 0:
+            abort(422)
+
+        try:
+            category_id = int(category['id'] or 0)
+        except (KeyError, TypeError, ValueError):
+            abort(422)
+
+        try:
+            total, rank = leaderboards.add_score(player.strip(), category_id, score)
+        except KeyError:
+            abort(422)
+
+        return jsonify({
+            'success': True,
+            'player': player.strip(),
+            'score': total,
+            'rank': rank
+        })
+
+    @app.route('/leaderboards/<int:category_id>')
+    @limiter.limit(*READ_RATE_LIMIT)
+    def get_leaderboard(category_id):
+        """Gets the players with the highest scores in a category.
+
+        Args:
+            category_id (int): Id of the category, or 0 for all categories.
+            limit (int, optional): Number of players to return. Defaults to
+            LEADERBOARD_SIZE.
+
+        Returns:
+            json: {
+                'success': bool,
+                'category': int,
+                'players': list
+            }
+
+        Errors:
+            404: Returned if the category does not exist or nobody has scored
+            in it.
+        """
+
+        limit = min(max(request.args.get('limit', LEADERBOARD_SIZE, type=int), 1), 100)
+
+        try:
+            players = leaderboards.top(category_id, limit)
+        except KeyError:
+            abort(404)
+
+        if len(players) == 0:
+            abort(404)
+
+        return jsonify({
+            'success': True,
+            'category': category_id,
+            'players': [{'player': player, 'score': score} for player, score in players]
+        })
+
+    @app.route('/leaderboards/<int:category_id>/players/<player>')
+    @limiter.limit(*READ_RATE_LIMIT)
+    def get_player_rank(category_id, player):
+        """Gets the score and rank of a player in a category.
+
+        Args:
+            category_id (int): Id of the category, or 0 for all categories.
+            player (str): Name of the player.
+
+        Returns:
+            json: {
+                'success': bool,
+                'category': int,
+                'player': str,
+                'score': int,
+                'rank': int
+            }
+
+        Errors:
+            404: Returned if the category does not exist or the player has not
+            scored in it.
+        """
+
+        try:
+            result = leaderboards.rank(category_id, player)
+        except KeyError:
+            abort(404)
+
+        if result is None:
+            abort(404)
+
+        score, rank = result
+
+        return jsonify({
+            'success': True,
+            'category': category_id,
+            'player': player,
+            'score': score,
+            'rank': rank
+        })
 
     '''
     @ [DONE] TODO:
@@ -449,6 +1064,30 @@ def create_app(test_config=None):
             'message': 'not found'
         }), 404
 
+    @app.errorhandler(409)
+    def conflict(error):
+        """The request conflicts with the current state of the server.
+
+        Args:
+            error (Conflict): http exeption.
+
+        Returns:
+            json: {
+                'success': bool,
+                'error': int,
+                'message': str,
+                'duplicates': list
+            }
+            int: http status code.
+        """
+
+        return jsonify({
+            'success': False,
+            'error': 409,
+            'message': 'conflict',
+            'duplicates': getattr(error, 'duplicates', [])
+        }), 409
+
     @app.errorhandler(422)
     def unprocessable(error):
         """The request was well-formed but was unable to be followed
@@ -472,6 +1111,33 @@ def create_app(test_config=None):
             'message': 'unprocessable'
         }), 422
 
+    @app.errorhandler(429)
+    def too_many_requests(error):
+        """The client has sent too many requests in a given amount of time.
+
+        Args:
+            error (TooManyRequests): http exeption.
+
+        Returns:
+            json: {
+                'success': bool,
+                'error': int,
+                'message': str
+            }
+            int: http status code.
+            dict: Response headers.
+        """
+
+        headers = {}
+        if getattr(error, 'retry_after', None) is not None:
+            headers['Retry-After'] = str(error.retry_after)
+
+        return jsonify({
+            'success': False,
+            'error': 429,
+            'message': 'too many requests'
+        }), 429, headers
+
     @app.errorhandler(500)
     def internal_server_error(error):
         """The server has encountered a situation it doesn't know how to handle.
@@ -0,0 +1,361 @@
+import threading
+import unicodedata
+from collections import Counter, OrderedDict
+from models import db, Question
+from .refresh import refresh_in_background
+
+
+ARTICLES = ('the', 'a', 'an')
+KEY_SEPARATOR = '|'
+
+# Keys shorter than SHORT_KEY only tolerate two swapped letters, as a single
+# edit often turns them into another word, e.g. 'Paris' into 'Parts'. Keys of
+# at least LONG_KEY characters tolerate two typos.
+SHORT_KEY = 8
+LONG_KEY = 12
+
+BATCH_SIZE = 500
+
+
+def normalize(text):
+    """Normalizes an answer so that trivial differences are ignored.
+
+    The text is casefolded, accents and punctuation are stripped and
+    whitespace is collapsed, e.g. 'The Palace of Versailles!' becomes
+    'the palace of versailles'.
+
+    Args:
+        text (str): Text to normalize.
+
+    Returns:
+        str: Normalized text.
+    """
+
+    text = unicodedata.normalize('NFKD', text.casefold())
+    text = ''.join(
+        character for character in text
+        if not unicodedata.combining(character)
+        and not unicodedata.category(character).startswith('P'))
+
+    return ' '.join(text.split())
+
+
+def strip_article(text):
+    """Removes a leading article from normalized text.
+
+    Args:
+        text (str): Normalized text.
+
+    Returns:
+        str: Text without a leading article.
+    """
+
+    first, _, rest = text.partition(' ')
+    if first in ARTICLES and rest:
+        return rest
+
+    return text
+
+
+def make_answer_keys(answer, aliases=None):
+    """Precomputes the normalized keys a guess is matched against.
+
+    Args:
+        answer (str): Answer to the question.
+        aliases (list, optional): Alternative accepted answers.
+
+    Returns:
+        str: Normalized keys joined by KEY_SEPARATOR.
+
+    Raises:
+        ValueError: If the answer or an alias contains KEY_SEPARATOR.
+    """
+
+    keys = []
+    for text in [answer] + list(aliases or []):
+        key = normalize(text)
+        if KEY_SEPARATOR in key:
+            raise ValueError(f'answers may not contain {KEY_SEPARATOR!r}')
+
+        for variant in (key, strip_article(key)):
+            if variant and variant not in keys:
+                keys.append(variant)
+
+    return KEY_SEPARATOR.join(keys)
+
+
+def max_distance(guess, key):
+    """Number of typos tolerated between a guess and a key, which grows
+    with the length of the shorter one. Numbers must match exactly.
+
+    Args:
+        guess (str): Normalized guess.
+        key (str): Normalized key.
+
+    Returns:
+        int: Maximum edit distance.
+    """
+
+    if any(character.isdigit() for character in guess + key):
+        return 0
+
+    return 2 if min(len(guess), len(key)) >= LONG_KEY else 1
+
+
+def is_transposition(first, second):
+    """Checks whether two strings only differ by two swapped adjacent
+    characters.
+
+    Args:
+        first (str): First string.
+        second (str): Second string.
+
+    Returns:
+        bool: Whether swapping two adjacent characters of first gives second.
+    """
+
+    if len(first) != len(second):
+        return False
+
+    differences = [i for i, (a, b) in enumerate(zip(first, second)) if a != b]
+
+    return (len(differences) == 2 and differences[1] == differences[0] + 1 and
+            first[differences[0]] == second[differences[1]] and
+            first[differences[1]] == second[differences[0]])
+
+
+def is_typo(guess, key):
+    """Checks whether a guess is a misspelling of a key.
+
+    Args:
+        guess (str): Normalized guess.
+        key (str): Normalized key.
+
+    Returns:
+        bool: Whether the guess is within the tolerated typos of the key.
+    """
+
+    limit = max_distance(guess, key)
+    if not limit:
+        return False
+
+    if min(len(guess), len(key)) < SHORT_KEY:
+        return is_transposition(guess, key)
+
+    return within_distance(guess, key, limit)
+
+
+def within_distance(first, second, limit):
+    """Checks whether the edit distance of two strings is at most limit.
+
+    Only a band of width 2 * limit + 1 around the diagonal of the
+    Levenshtein matrix is computed, and the check exits as soon as a whole
+    row exceeds the limit, so the cost is O(limit * len) at worst.
+
+    Args:
+        first (str): First string.
+        second (str): Second string.
+        limit (int): Maximum edit distance.
+
+    Returns:
+        bool: Whether the strings are within limit edits of each other.
+    """
+
+    if first == second:
+        return True
+
+    if abs(len(first) - len(second)) > limit:
+        return False
+
+    if len(first) > len(second):
+        first, second = second, first
+
+    over = limit + 1
+    previous = [column if column <= limit else over
+                for column in range(len(second) + 1)]
+
+    for row in range(1, len(first) + 1):
+        current = [over] * (len(second) + 1)
+        current[0] = row if row <= limit else over
+        row_minimum = current[0]
+
+        for column in range(max(1, row - limit), min(len(second), row + limit) + 1):
+            value = min(
+                previous[column] + 1,
+                current[column - 1] + 1,
+                previous[column - 1] + (first[row - 1] != second[column - 1]))
+            current[column] = min(value, over)
+            row_minimum = min(row_minimum, current[column])
+
+        if row_minimum > limit:
+            return False
+
+        previous = current
+
+    return previous[-1] <= limit
+
+
+def is_correct(guess, answer_keys, is_known=None):
+    """Checks a guess against the precomputed keys of an answer.
+
+    A guess that is itself a known answer, e.g. 'Zambia' for 'Gambia', is
+    never taken for a typo.
+
+    Args:
+        guess (str): Answer given by the player.
+        answer_keys (str): Keys returned by make_answer_keys.
+        is_known (callable, optional): Returns whether a normalized guess is
+        the key of any answer. Only called for guesses matching with typos.
+
+    Returns:
+        bool: Whether the guess matches any of the keys.
+    """
+
+    guess = strip_article(normalize(guess))
+    if not guess:
+        return False
+
+    keys = answer_keys.split(KEY_SEPARATOR)
+    if guess in keys:
+        return True
+
+    if not any(is_typo(guess, key) for key in keys):
+        return False
+
+    return not (is_known is not None and is_known(guess))
+
+
+def backfill_answer_keys(batch_size=BATCH_SIZE):
+    """Saves the answer keys of questions that have none stored, committing
+    once per batch.
+
+    Args:
+        batch_size (int, optional): Number of rows fetched per query.
+
+    Returns:
+        int: Number of questions updated.
+    """
+
+    after_id = 0
+    saved = 0
+
+    while True:
+        rows = Question.query.with_entities(Question.id, Question.answer).filter(
+            Question.id > after_id, Question.answer_keys.is_(None)).order_by(
+            Question.id).limit(batch_size).all()
+
+        db.session.bulk_update_mappings(Question, [
+            {'id': question_id, 'answer_keys': make_answer_keys(answer)}
+            for question_id, answer in rows])
+        db.session.commit()
+        saved += len(rows)
+
+        if len(rows) < batch_size:
+            return saved
+
+        after_id = rows[-1][0]
+
+
+class KnownAnswers:
+    """In-memory multiset of the answer keys of all questions, so a guess
+    can be checked against every answer without a query.
+
+    Kept up to date by Question.insert and Question.delete, and reloaded in
+    the background for changes made by other processes.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.keys = Counter()
+        self.lock = threading.Lock()
+
+    def __contains__(self, key):
+        return self.keys[key] > 0
+
+    def _keys(self, answer, answer_keys):
+        return (answer_keys or make_answer_keys(answer)).split(KEY_SEPARATOR)
+
+    def add_question(self, answer, answer_keys):
+        """Adds the keys of a question, computing them if none were stored.
+
+        Args:
+            answer (str): Answer to the question.
+            answer_keys (str): Stored keys or None.
+        """
+
+        with self.lock:
+            self.keys.update(self._keys(answer, answer_keys))
+
+    def remove_question(self, answer, answer_keys):
+        """Removes the keys of a question.
+
+        Args:
+            answer (str): Answer to the question.
+            answer_keys (str): Stored keys or None.
+        """
+
+        with self.lock:
+            self.keys.subtract(self._keys(answer, answer_keys))
+            self.keys += Counter()
+
+    def init_app(self, app):
+        """Loads the answers of an app and reloads them every
+        REFRESH_INTERVAL seconds in the background.
+
+        Args:
+            app (flask.Flask): Flask app.
+        """
+
+        self.app = app
+        with app.app_context():
+            self.refresh()
+
+        refresh_in_background(self)
+
+    def refresh(self):
+        """Reloads the keys of every question, scanning the table in batches."""
+
+        keys = Counter()
+        after_id = 0
+        while True:
+            rows = Question.query.with_entities(
+                Question.id, Question.answer, Question.answer_keys).filter(
+                Question.id > after_id).order_by(Question.id).limit(BATCH_SIZE).all()
+
+            for _, answer, answer_keys in rows:
+                keys.update(self._keys(answer, answer_keys))
+
+            if len(rows) < BATCH_SIZE:
+                break
+
+            after_id = rows[-1][0]
+
+        with self.lock:
+            self.keys = keys
+
+
+class AnswerKeyCache:
+    """Bounded LRU cache of answers and their keys by question id."""
+
+    def __init__(self, max_size=4096):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, question_id):
+        with self.lock:
+            entry = self.entries.get(question_id)
+            if entry is not None:
+                self.entries.move_to_end(question_id)
+            return entry
+
+    def set(self, question_id, entry):
+        with self.lock:
+            self.entries[question_id] = entry
+            self.entries.move_to_end(question_id)
+            if len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def discard(self, question_id):
+        with self.lock:
+            self.entries.pop(question_id, None)
@@ -0,0 +1,251 @@
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, request
+
+
+class CacheBackend:
+    """Interface for storing serialized responses.
+
+    Entries are keyed by the data version they were computed for, so
+    invalidating the cache only requires bumping the version.
+    """
+
+    def get(self, key):
+        """Gets the value stored for key.
+
+        Args:
+            key (str): Key of the entry.
+
+        Returns:
+            bytes: Stored value or None if there is no entry for key.
+        """
+
+        raise NotImplementedError
+
+    def set(self, key, value):
+        """Stores a value for key.
+
+        Args:
+            key (str): Key of the entry.
+            value (bytes): Value to store.
+        """
+
+        raise NotImplementedError
+
+    def version(self):
+        """Gets the current data version.
+
+        Returns:
+            int: Current data version.
+        """
+
+        raise NotImplementedError
+
+    def bump_version(self):
+        """Increments the data version, invalidating all existing entries."""
+
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Stores entries in the memory of the current process.
+
+    Least recently used entries are evicted once the total size of the
+    stored values exceeds max_bytes. As the data version is only bumped in
+    the process making a change, entries expire after ttl seconds, so other
+    processes serve stale responses for at most that long.
+    """
+
+    def __init__(self, max_bytes=16 * 1024 * 1024, ttl=10.0, clock=time.monotonic):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self.size = 0
+        self.entries = OrderedDict()
+        self.data_version = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+
+            value, expires = entry
+            if self.clock() >= expires:
+                del self.entries[key]
+                self.size -= len(value)
+                return None
+
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous[0])
+
+            self.entries[key] = (value, self.clock() + self.ttl)
+            self.size += len(value)
+
+            while self.size > self.max_bytes:
+                _, (evicted, _) = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def version(self):
+        return self.data_version
+
+    def bump_version(self):
+        with self.lock:
+            self.data_version += 1
+            self.entries.clear()
+            self.size = 0
+
+
+class FileCacheBackend(CacheBackend):
+    """Stores entries as files in a directory shared by all processes on
+    the host, e.g. every gunicorn worker.
+
+    The data version is kept in a memory-mapped file, so reading it does not
+    need a system call, and is only incremented while holding a file lock.
+    """
+
+    VERSION_FILE = 'version'
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+        path = os.path.join(directory, self.VERSION_FILE)
+        self.version_fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+
+        fcntl.flock(self.version_fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self.version_fd).st_size < 8:
+                os.ftruncate(self.version_fd, 8)
+        finally:
+            fcntl.flock(self.version_fd, fcntl.LOCK_UN)
+
+        self.version_map = mmap.mmap(self.version_fd, 8)
+
+    def _path(self, key):
+        return os.path.join(
+            self.directory, hashlib.sha1(key.encode()).hexdigest())
+
+    def get(self, key):
+        try:
+            with open(self._path(key), 'rb') as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+    def set(self, key, value):
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as file:
+            file.write(value)
+        os.replace(temp_path, self._path(key))
+
+    def version(self):
+        return struct.unpack('<Q', self.version_map[:8])[0]
+
+    def bump_version(self):
+        fcntl.flock(self.version_fd, fcntl.LOCK_EX)
+        try:
+            self.version_map[:8] = struct.pack('<Q', self.version() + 1)
+        finally:
+            fcntl.flock(self.version_fd, fcntl.LOCK_UN)
+
+        for name in os.listdir(self.directory):
+            if name != self.VERSION_FILE and not name.endswith('.tmp'):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    pass
+
+
+class RedisCacheBackend(CacheBackend):
+    """Stores entries in Redis or any client with a compatible get, set and
+    incr interface.
+    """
+
+    VERSION_KEY = 'trivia:cache:version'
+
+    def __init__(self, client, prefix='trivia:cache:', ttl=300):
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value):
+        self.client.set(self.prefix + key, value, ex=self.ttl)
+
+    def version(self):
+        return int(self.client.get(self.VERSION_KEY) or 0)
+
+    def bump_version(self):
+        self.client.incr(self.VERSION_KEY)
+
+
+class ResponseCache:
+    """Caches the serialized JSON responses of GET routes.
+
+    Responses are keyed by the data version, the route and its query
+    arguments. Only successful responses are cached.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend if backend is not None else MemoryCacheBackend()
+
+    def invalidate(self):
+        """Invalidates all cached responses."""
+
+        self.backend.bump_version()
+
+    def cached(self, view):
+        """Decorator to cache the responses of a route.
+
+        Args:
+            view (function): Route to decorate.
+
+        Returns:
+            function: Decorated route.
+        """
+
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method != 'GET':
+                return view(*args, **kwargs)
+
+            args_key = '&'.join(
+                f'{name}={value}' for name, value in sorted(request.args.items(multi=True)))
+            key = f'{self.backend.version()}:{request.path}?{args_key}'
+
+            data = self.backend.get(key)
+            if data is not None:
+                response = current_app.response_class(
+                    data, mimetype='application/json')
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                self.backend.set(key, response.get_data())
+            response.headers['X-Cache'] = 'MISS'
+
+            return response
+
+        return wrapper
@@ -0,0 +1,87 @@
+import threading
+from functools import wraps
+from flask import current_app, make_response, request
+
+
+class _Call:
+    """An in-flight computation shared by concurrent identical requests."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces concurrent identical GET requests into one computation.
+
+    The first request for a given path and query string runs the route while
+    any identical requests that arrive in the meantime wait for it and
+    receive a copy of its response.
+    """
+
+    def __init__(self):
+        self.calls = {}
+        self.lock = threading.Lock()
+
+    def do(self, key, function):
+        """Runs function once for all concurrent callers with the same key.
+
+        Args:
+            key (str): Key identifying identical calls.
+            function (function): Computation to run.
+
+        Returns:
+            Result of function.
+
+        Raises:
+            Exception: Whatever function raised, for every caller.
+        """
+
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+
+        if leader:
+            try:
+                call.result = function()
+            except Exception as error:
+                call.error = error
+            finally:
+                with self.lock:
+                    del self.calls[key]
+                call.done.set()
+        else:
+            call.done.wait()
+
+        if call.error is not None:
+            raise call.error
+
+        return call.result
+
+    def coalesce(self, view):
+        """Decorator to coalesce concurrent identical requests to a route.
+
+        Args:
+            view (function): Route to decorate.
+
+        Returns:
+            function: Decorated route.
+        """
+
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method != 'GET':
+                return view(*args, **kwargs)
+
+            def compute():
+                response = make_response(view(*args, **kwargs))
+                return response.get_data(), response.status_code, list(response.headers)
+
+            data, status, headers = self.do(request.full_path, compute)
+
+            return current_app.response_class(data, status, headers)
+
+        return wrapper
@@ -0,0 +1,338 @@
+import hashlib
+import random
+import threading
+import time
+from sqlalchemy import or_
+from models import db, Question
+from .answers import normalize
+from .refresh import refresh_in_background
+
+
+# Signatures consist of NUM_HASHES MinHash values, split into BANDS bands of
+# ROWS values for the LSH index. With 16 bands of 4 rows, questions with a
+# similarity of 0.8 become candidates 99.9% of the time, while questions with a
+# similarity below 0.3 rarely do.
+NUM_HASHES = 64
+BANDS = 16
+ROWS = NUM_HASHES // BANDS
+
+# Questions differing in a single word, e.g. 'World War I' and 'World War II',
+# have a similarity of about 0.7, so they are not considered duplicates.
+THRESHOLD = 0.8
+BATCH_SIZE = 500
+
+# Stored signatures are prefixed with the version of the shingling they were
+# computed with. Signatures of other versions are recomputed when scanning, and
+# saved by the backfill-signatures command.
+SIGNATURE_VERSION = 'w1:'
+
+_PRIME = (1 << 61) - 1
+_random = random.Random(NUM_HASHES)
+_PERMUTATIONS = [(_random.randrange(1, _PRIME), _random.randrange(0, _PRIME))
+                 for _ in range(NUM_HASHES)]
+
+
+def shingles(text):
+    """Splits normalized text into its words and pairs of adjacent words.
+
+    Every shingle is prefixed with the numbers in the text, so questions
+    asking about different numbers, e.g. years, share no shingles at all.
+
+    Args:
+        text (str): Text of a question.
+
+    Returns:
+        set: Shingles of the text.
+    """
+
+    words = normalize(text).split()
+    numbers = ' '.join(sorted(
+        {word for word in words if any(character.isdigit() for character in word)}))
+
+    terms = set(words) | {' '.join(words[i:i + 2]) for i in range(len(words) - 1)}
+
+    return {f'{numbers}|{term}' for term in terms or {''}}
+
+
+def make_signature(text):
+    """Computes the MinHash signature of a question.
+
+    Args:
+        text (str): Text of a question.
+
+    Returns:
+        tuple: NUM_HASHES 32-bit MinHash values.
+    """
+
+    hashes = [int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), 'big')
+              for shingle in shingles(text)]
+
+    return tuple(min((a * value + b) % _PRIME for value in hashes) & 0xffffffff
+                 for a, b in _PERMUTATIONS)
+
+
+def encode_signature(signature):
+    """Encodes a signature to be stored in Question.signature.
+
+    Args:
+        signature (tuple): MinHash values.
+
+    Returns:
+        str: Hex encoded signature.
+    """
+
+    return SIGNATURE_VERSION + ''.join(f'{value:08x}' for value in signature)
+
+
+def decode_signature(encoded):
+    """Decodes a signature stored in Question.signature.
+
+    Args:
+        encoded (str): Hex encoded signature or None.
+
+    Returns:
+        tuple: MinHash values or None if no signature of the current version
+        was stored.
+    """
+
+    if not encoded or not encoded.startswith(SIGNATURE_VERSION):
+        return None
+
+    encoded = encoded[len(SIGNATURE_VERSION):]
+
+    return tuple(int(encoded[i:i + 8], 16) for i in range(0, len(encoded), 8))
+
+
+def question_signature(question, encoded):
+    """Gets the signature of a question, computing it if it was not stored.
+
+    Args:
+        question (str): Text of the question.
+        encoded (str): Stored signature or None.
+
+    Returns:
+        tuple: MinHash values.
+    """
+
+    signature = decode_signature(encoded)
+    if signature is None:
+        signature = make_signature(question)
+
+    return signature
+
+
+def similarity(first, second):
+    """Estimates the Jaccard similarity of two questions.
+
+    Args:
+        first (tuple): Signature of the first question.
+        second (tuple): Signature of the second question.
+
+    Returns:
+        float: Estimated similarity between 0 and 1.
+    """
+
+    return sum(a == b for a, b in zip(first, second)) / NUM_HASHES
+
+
+def scan_signatures(after_id=0, batch_size=BATCH_SIZE):
+    """Streams the signatures of all questions in batches ordered by id.
+
+    Args:
+        after_id (int, optional): Only scan questions with a greater id.
+        batch_size (int, optional): Number of rows fetched per query.
+
+    Yields:
+        tuple: (question_id, signature)
+    """
+
+    while True:
+        rows = Question.query.with_entities(
+            Question.id, Question.question, Question.signature).filter(
+            Question.id > after_id).order_by(Question.id).limit(batch_size).all()
+
+        for question_id, question, encoded in rows:
+            yield question_id, question_signature(question, encoded)
+
+        if len(rows) < batch_size:
+            return
+
+        after_id = rows[-1][0]
+
+
+def backfill_signatures(batch_size=BATCH_SIZE):
+    """Saves the signatures of questions that have none stored or one of
+    another SIGNATURE_VERSION, committing once per batch.
+
+    Args:
+        batch_size (int, optional): Number of rows fetched per query.
+
+    Returns:
+        int: Number of signatures saved.
+    """
+
+    after_id = 0
+    saved = 0
+
+    while True:
+        rows = Question.query.with_entities(Question.id, Question.question).filter(
+            Question.id > after_id,
+            or_(Question.signature.is_(None),
+                ~Question.signature.startswith(SIGNATURE_VERSION))).order_by(
+            Question.id).limit(batch_size).all()
+
+        db.session.bulk_update_mappings(Question, [
+            {'id': question_id, 'signature': encode_signature(make_signature(question))}
+            for question_id, question in rows])
+        db.session.commit()
+        saved += len(rows)
+
+        if len(rows) < batch_size:
+            return saved
+
+        after_id = rows[-1][0]
+
+
+class LSHIndex:
+    """Locality-sensitive hashing index of question signatures.
+
+    Each signature is split into bands, and questions sharing any band are
+    compared, so a lookup only looks at a few candidates instead of the
+    whole corpus.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.app = None
+        self.buckets = [{} for _ in range(BANDS)]
+        self.signatures = {}
+        self.max_id = 0
+        self.refreshed = None
+        self.lock = threading.Lock()
+
+    def _bands(self, signature):
+        return [signature[band * ROWS:(band + 1) * ROWS] for band in range(BANDS)]
+
+    def add(self, question_id, signature):
+        with self.lock:
+            self._remove(question_id)
+            self.signatures[question_id] = signature
+            self.max_id = max(self.max_id, question_id)
+            for buckets, key in zip(self.buckets, self._bands(signature)):
+                buckets.setdefault(key, set()).add(question_id)
+
+    def add_question(self, question_id, question, encoded):
+        """Adds a question using its stored signature if it has one.
+
+        Args:
+            question_id (int): Id of the question.
+            question (str): Text of the question.
+            encoded (str): Stored signature or None.
+        """
+
+        self.add(question_id, question_signature(question, encoded))
+
+    def remove(self, question_id):
+        with self.lock:
+            self._remove(question_id)
+
+    def _remove(self, question_id):
+        signature = self.signatures.pop(question_id, None)
+        if signature is None:
+            return
+
+        for buckets, key in zip(self.buckets, self._bands(signature)):
+            bucket = buckets.get(key)
+            bucket.discard(question_id)
+            if not bucket:
+                del buckets[key]
+
+    def query(self, signature, threshold=THRESHOLD):
+        """Finds the questions similar to a signature.
+
+        Args:
+            signature (tuple): Signature to look up.
+            threshold (float, optional): Minimum estimated similarity.
+
+        Returns:
+            list: (question_id, similarity) tuples, most similar first.
+        """
+
+        with self.lock:
+            candidates = set()
+            for buckets, key in zip(self.buckets, self._bands(signature)):
+                candidates.update(buckets.get(key, ()))
+
+            matches = [(question_id, similarity(signature, self.signatures[question_id]))
+                       for question_id in candidates]
+
+        return sorted([match for match in matches if match[1] >= threshold],
+                      key=lambda match: -match[1])
+
+    def init_app(self, app):
+        """Loads the questions of an app and refreshes them every
+        REFRESH_INTERVAL seconds in the background.
+
+        Args:
+            app (flask.Flask): Flask app.
+        """
+
+        self.app = app
+        with app.app_context():
+            self.load()
+
+        refresh_in_background(self)
+
+    def load(self):
+        """Adds every question to the index, scanning the table in batches."""
+
+        for question_id, signature in scan_signatures():
+            self.add(question_id, signature)
+
+        self.refreshed = self.clock()
+
+    def refresh(self):
+        """Removes questions deleted and adds questions inserted by other
+        processes since the last refresh. Reads every question id, so it runs
+        in the background rather than while handling a request.
+        """
+
+        self.refreshed = self.clock()
+
+        # Questions added by this process after the ids were read are kept.
+        with self.lock:
+            indexed = set(self.signatures)
+
+        question_ids = {question_id for question_id, in
+                        Question.query.with_entities(Question.id).all()}
+        with self.lock:
+            for question_id in indexed - question_ids:
+                self._remove(question_id)
+
+        for question_id, signature in scan_signatures(after_id=self.max_id):
+            self.add(question_id, signature)
+
+
+def find_duplicates(threshold=THRESHOLD):
+    """Finds all pairs of near-duplicate questions, streaming the table in
+    batches and comparing each question only to LSH candidates.
+
+    Args:
+        threshold (float, optional): Minimum estimated similarity.
+
+    Returns:
+        tuple: (list of (question_id, duplicate_id, similarity) tuples,
+        number of questions scanned)
+    """
+
+    index = LSHIndex()
+    duplicates = []
+    total = 0
+
+    for question_id, signature in scan_signatures():
+        total += 1
+        for duplicate_id, score in index.query(signature, threshold):
+            duplicates.append((duplicate_id, question_id, score))
+        index.add(question_id, signature)
+
+    return duplicates, total
@@ -0,0 +1,142 @@
+import itertools
+import json
+import queue
+import threading
+import time
+
+
+# Maximum number of undelivered events per client. Clients that fall further
+# behind are sent a reset event and should re-fetch instead.
+BUFFER_SIZE = 100
+
+# Seconds between keep-alive comments, which also detect closed connections.
+HEARTBEAT_INTERVAL = 15
+
+# Seconds after which a stream is closed, so that a connection only occupies a
+# worker for a bounded time, and seconds the client waits before reconnecting.
+STREAM_LIFETIME = 300
+RECONNECT_DELAY = 1
+
+
+class Subscription:
+    """Bounded buffer of events for a single client."""
+
+    def __init__(self, size=BUFFER_SIZE):
+        self.events = queue.Queue(maxsize=size)
+        self.overflowed = False
+
+    def put(self, event):
+        try:
+            self.events.put_nowait(event)
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout):
+        """Waits for the next event.
+
+        Args:
+            timeout (float): Seconds to wait.
+
+        Returns:
+            dict: Next event, a reset event if events were dropped, or None
+            if no event arrived in time.
+        """
+
+        if self.overflowed:
+            self.overflowed = False
+            with self.events.mutex:
+                self.events.queue.clear()
+            return {'type': 'reset'}
+
+        try:
+            return self.events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventBroker:
+    """In-process pub/sub fanout of question bank changes."""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.subscriptions = set()
+        self.ids = itertools.count(1)
+        self.last_id = 0
+        self.lock = threading.Lock()
+
+    def subscribe(self):
+        subscription = Subscription()
+        with self.lock:
+            self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscriptions.discard(subscription)
+
+    def publish(self, event_type, **data):
+        """Sends an event to every subscribed client without blocking.
+
+        Args:
+            event_type (str): Type of the event, e.g. 'created'.
+            **data: Payload of the event.
+        """
+
+        with self.lock:
+            event = dict(data, type=event_type, id=next(self.ids))
+            self.last_id = event['id']
+            subscriptions = list(self.subscriptions)
+
+        for subscription in subscriptions:
+            subscription.put(event)
+
+    def stream(self, last_event_id=None, heartbeat_interval=HEARTBEAT_INTERVAL,
+               lifetime=STREAM_LIFETIME):
+        """Subscribes to the events and formats them as Server-Sent Events.
+
+        The subscription is only made once the stream is iterated and ends
+        with it, so a response that is never sent does not leak one.
+
+        Args:
+            last_event_id (str, optional): Id of the last event a reconnecting
+            client received. A reset event is sent first if it missed any.
+            heartbeat_interval (float, optional): Seconds between keep-alive
+            comments. Defaults to HEARTBEAT_INTERVAL.
+            lifetime (float, optional): Seconds after which the stream ends
+            and the client reconnects. Defaults to STREAM_LIFETIME.
+
+        Yields:
+            str: Server-Sent Events messages.
+        """
+
+        subscription = self.subscribe()
+        with self.lock:
+            current_id = self.last_id
+        closes = self.clock() + lifetime
+
+        try:
+            # Also sending the current id, so the client sends it back when it
+            # reconnects even if it received no event.
+            yield f'retry: {RECONNECT_DELAY * 1000}\nid: {current_id}\n\n'
+
+            if last_event_id is not None and last_event_id != str(current_id):
+                yield 'event: reset\ndata: {"type": "reset"}\n\n'
+
+            while True:
+                remaining = closes - self.clock()
+                if remaining <= 0:
+                    return
+
+                event = subscription.get(timeout=min(heartbeat_interval, remaining))
+                if event is None:
+                    yield ': keep-alive\n\n'
+                    continue
+
+                message = f'event: {event["type"]}\ndata: {json.dumps(event)}\n\n'
+                if 'id' in event:
+                    message = f'id: {event["id"]}\n' + message
+
+                yield message
+
+        finally:
+            self.unsubscribe(subscription)
@@ -0,0 +1,278 @@
+import atexit
+import threading
+import time
+import weakref
+from bisect import bisect_left, insort
+from models import db, Category, Score
+from .logs import logger
+
+
+ALL_CATEGORIES = 0
+
+# Pending score updates are written once there are this many of them, and
+# by a background thread every FLUSH_INTERVAL seconds.
+FLUSH_SIZE = 100
+FLUSH_INTERVAL = 5.0
+
+# Boards are reloaded from the database after this many seconds, picking up
+# scores written by other processes.
+REFRESH_INTERVAL = 60.0
+
+# Leaderboards whose pending updates are written when the process exits.
+_leaderboards = weakref.WeakSet()
+
+
+@atexit.register
+def _close_all():
+    for leaderboards in list(_leaderboards):
+        leaderboards.close()
+
+
+class Board:
+    """Scores of a single category, kept sorted for top-k and rank queries."""
+
+    def __init__(self, scores):
+        self.scores = dict(scores)
+        self.entries = sorted(
+            (-score, player) for player, score in self.scores.items())
+
+    def add(self, player, points):
+        """Adds points to the score of a player.
+
+        Args:
+            player (str): Name of the player.
+            points (int): Points to add.
+
+        Returns:
+            int: New score of the player.
+        """
+
+        score = self.scores.get(player)
+        if score is not None:
+            del self.entries[bisect_left(self.entries, (-score, player))]
+
+        score = (score or 0) + points
+        self.scores[player] = score
+        insort(self.entries, (-score, player))
+
+        return score
+
+    def top(self, limit):
+        """Gets the players with the highest scores.
+
+        Args:
+            limit (int): Number of players to return.
+
+        Returns:
+            list: (player, score) tuples in descending order of score.
+        """
+
+        return [(player, -score) for score, player in self.entries[:limit]]
+
+    def rank(self, player):
+        """Gets the rank of a player, where tied players share a rank.
+
+        Args:
+            player (str): Name of the player.
+
+        Returns:
+            tuple: (score, rank) of the player or None if the player has no
+            score in this category.
+        """
+
+        score = self.scores.get(player)
+        if score is None:
+            return None
+
+        return score, bisect_left(self.entries, (-score,)) + 1
+
+
+class Leaderboards:
+    """In-memory leaderboards backed by the scores table.
+
+    Boards are loaded lazily per category and updated in place, while the
+    score updates are buffered and written to the database in batches.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.app = None
+        self.boards = {}
+        self.pending = {}
+        self.flushing = {}
+        self.flusher = None
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+
+    def init_app(self, app):
+        """Sets the app whose database the scores are written to, and
+        writes the pending updates when the process exits.
+
+        Args:
+            app (flask.Flask): Flask app.
+        """
+
+        self.app = app
+        _leaderboards.add(self)
+
+    def _start_flusher(self):
+        # The background thread only runs while there are pending updates,
+        # writing them every FLUSH_INTERVAL seconds.
+        if self.app is None or self.stopped.is_set() or \
+                (self.flusher is not None and self.flusher.is_alive()):
+            return
+
+        def run():
+            while not self.stopped.wait(FLUSH_INTERVAL):
+                with self.app.app_context():
+                    self.flush()
+
+                with self.lock:
+                    if not self.pending:
+                        self.flusher = None
+                        return
+
+        self.flusher = threading.Thread(target=run, daemon=True)
+        self.flusher.start()
+
+    def close(self):
+        """Stops the background thread and writes the pending updates."""
+
+        self.stopped.set()
+        if self.app is not None:
+            with self.app.app_context():
+                self.flush()
+
+    def _load(self, category_id):
+        if category_id == ALL_CATEGORIES:
+            return Score.query.with_entities(Score.player, Score.score).filter(
+                Score.category == ALL_CATEGORIES).all()
+
+        # Joining the category, so that a single query also checks it exists.
+        rows = Category.query.outerjoin(Score, Score.category == Category.id).with_entities(
+            Score.player, Score.score).filter(Category.id == category_id).all()
+        if not rows:
+            raise KeyError(category_id)
+
+        return [(player, score) for player, score in rows if player is not None]
+
+    def _board(self, category_id):
+        board, loaded = self.boards.get(category_id, (None, None))
+        if board is None or self.clock() - loaded > REFRESH_INTERVAL:
+            if board is not None and any(
+                    category == category_id for _, category in self.flushing):
+                # Updates being written may or may not be loaded, so the board
+                # is reloaded once the flush is over.
+                return board
+
+            board = Board(self._load(category_id))
+            for (player, category), points in self.pending.items():
+                if category == category_id:
+                    board.add(player, points)
+
+            self.boards[category_id] = (board, self.clock())
+
+        return board
+
+    def add_score(self, player, category_id, points):
+        """Adds points to the score of a player in a category and in the
+        overall leaderboard.
+
+        Args:
+            player (str): Name of the player.
+            category_id (int): Id of the category.
+            points (int): Points to add.
+
+        Returns:
+            tuple: (score, rank) of the player in the category.
+
+        Raises:
+            KeyError: If the category does not exist.
+        """
+
+        with self.lock:
+            boards = {board_id: self._board(board_id)
+                      for board_id in {category_id, ALL_CATEGORIES}}
+
+            for board_id, board in boards.items():
+                board.add(player, points)
+                key = (player, board_id)
+                self.pending[key] = self.pending.get(key, 0) + points
+
+            result = boards[category_id].rank(player)
+            should_flush = len(self.pending) >= FLUSH_SIZE
+            self._start_flusher()
+
+        if should_flush:
+            self.flush()
+
+        return result
+
+    def top(self, category_id, limit):
+        """Gets the players with the highest scores in a category.
+
+        Args:
+            category_id (int): Id of the category.
+            limit (int): Number of players to return.
+
+        Returns:
+            list: (player, score) tuples in descending order of score.
+
+        Raises:
+            KeyError: If the category does not exist.
+        """
+
+        with self.lock:
+            return self._board(category_id).top(limit)
+
+    def rank(self, category_id, player):
+        """Gets the score and rank of a player in a category.
+
+        Args:
+            category_id (int): Id of the category.
+            player (str): Name of the player.
+
+        Returns:
+            tuple: (score, rank) or None if the player has no score.
+
+        Raises:
+            KeyError: If the category does not exist.
+        """
+
+        with self.lock:
+            return self._board(category_id).rank(player)
+
+    def flush(self):
+        """Writes the pending score updates to the database in a single
+        transaction.
+        """
+
+        with self.lock:
+            if self.flushing or not self.pending:
+                return
+
+            pending = self.flushing = self.pending
+            self.pending = {}
+
+        try:
+            for (player, category_id), points in pending.items():
+                updated = Score.query.filter(
+                    Score.player == player, Score.category == category_id).update(
+                    {Score.score: Score.score + points}, synchronize_session=False)
+
+                if not updated:
+                    db.session.add(Score(player, category_id, points))
+
+            db.session.commit()
+
+        except:
+            db.session.rollback()
+            logger.exception('failed to write scores')
+
+            with self.lock:
+                for key, points in pending.items():
+                    self.pending[key] = self.pending.get(key, 0) + points
+
+        finally:
+            with self.lock:
+                self.flushing = {}
@@ -0,0 +1,114 @@
+import atexit
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+import traceback
+from datetime import datetime, timezone
+
+
+QUEUE_SIZE = 10000
+BATCH_SIZE = 100
+
+logger = logging.getLogger('flaskr')
+
+
+class AsyncJSONHandler(logging.Handler):
+    """Logging handler that writes JSON lines from a background thread.
+
+    Emitting a record only puts it on a bounded queue, so logging never
+    blocks the request thread. If the queue is full the record is dropped
+    and counted, and the writer reports the number of dropped records.
+    Records are serialized and written in batches by the writer thread.
+    """
+
+    def __init__(self, stream=None, queue_size=QUEUE_SIZE, batch_size=BATCH_SIZE):
+        super().__init__()
+        self.stream = stream if stream is not None else sys.stdout
+        self.batch_size = batch_size
+        self.records = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.dropped_lock = threading.Lock()
+        self.writer = threading.Thread(target=self.write, daemon=True)
+        self.writer.start()
+
+    def emit(self, record):
+        entry = {
+            'time': record.created,
+            'level': record.levelname,
+            'message': record.msg if not record.args else record.getMessage(),
+        }
+        entry.update(getattr(record, 'fields', {}))
+
+        if record.exc_info:
+            entry['exception'] = ''.join(
+                traceback.format_exception(*record.exc_info))
+
+        try:
+            self.records.put_nowait(entry)
+        except queue.Full:
+            with self.dropped_lock:
+                self.dropped += 1
+
+    def write(self):
+        """Writes queued records until a None sentinel is received."""
+
+        running = True
+        while running:
+            batch = [self.records.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.records.get_nowait())
+                except queue.Empty:
+                    break
+
+            if None in batch:
+                running = False
+                batch = [entry for entry in batch if entry is not None]
+
+            with self.dropped_lock:
+                dropped, self.dropped = self.dropped, 0
+            if dropped:
+                batch.append({'time': time.time(),
+                              'level': 'WARNING',
+                              'message': 'log records dropped',
+                              'dropped': dropped})
+
+            lines = []
+            for entry in batch:
+                entry['time'] = datetime.fromtimestamp(
+                    entry['time'], timezone.utc).isoformat()
+                lines.append(json.dumps(entry, default=str) + '\n')
+
+            try:
+                self.stream.write(''.join(lines))
+                self.stream.flush()
+            except Exception:
+                pass
+
+    def close(self):
+        """Writes the remaining records and stops the writer thread."""
+
+        if self.writer.is_alive():
+            self.records.put(None)
+            self.writer.join()
+        super().close()
+
+
+def setup_logging():
+    """Attaches a single AsyncJSONHandler to the flaskr logger of the process.
+
+    Returns:
+        logging.Logger: The flaskr logger.
+    """
+
+    if not any(isinstance(handler, AsyncJSONHandler) for handler in logger.handlers):
+        handler = AsyncJSONHandler()
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        atexit.register(handler.close)
+
+    return logger
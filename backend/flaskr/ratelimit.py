@@ -0,0 +1,120 @@
+import math
+import threading
+import time
+from functools import wraps
+from flask import request
+from werkzeug.exceptions import TooManyRequests
+
+
+# Seconds between sweeps removing buckets that have refilled completely, which
+# behave the same as missing buckets.
+SWEEP_INTERVAL = 60.0
+
+
+class RateLimitBackend:
+    """Interface for storing token buckets.
+
+    Backends only need to implement consume, which makes it possible to
+    swap the in-memory store for a shared one (e.g. Redis) without touching
+    the routes.
+    """
+
+    def consume(self, key, rate, capacity):
+        """Takes a token from the bucket identified by key.
+
+        Args:
+            key (str): Id of the bucket.
+            rate (float): Tokens added to the bucket per second.
+            capacity (int): Maximum number of tokens in the bucket.
+
+        Returns:
+            tuple: (bool, float) Whether a token was available and the
+            number of seconds until the next token is available.
+        """
+
+        raise NotImplementedError
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """Stores token buckets in the memory of the current process.
+
+    Buckets of idle clients are removed once they have refilled, so the
+    number of buckets is bounded by the number of recently active clients.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.buckets = {}
+        self.swept = clock()
+        self.lock = threading.Lock()
+
+    def _sweep(self, now):
+        self.buckets = {key: bucket for key, bucket in self.buckets.items()
+                        if bucket[2] > now}
+        self.swept = now
+
+    def consume(self, key, rate, capacity):
+        with self.lock:
+            now = self.clock()
+            if now - self.swept >= SWEEP_INTERVAL:
+                self._sweep(now)
+
+            tokens, updated, _ = self.buckets.get(key, (capacity, now, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+
+            # Also storing when the bucket will be full again.
+            self.buckets[key] = (tokens, now, now + (capacity - tokens) / rate)
+
+            if allowed:
+                return True, 0.0
+
+            return False, (1 - tokens) / rate
+
+
+class RateLimiter:
+    """Token bucket rate limiter for Flask routes.
+
+    Clients are identified by the X-API-Key header if it contains one of
+    api_keys, or by their remote address otherwise, so that clients cannot
+    get a fresh bucket by sending a new key.
+    """
+
+    def __init__(self, backend=None, api_keys=()):
+        self.backend = backend if backend is not None else MemoryRateLimitBackend()
+        self.api_keys = frozenset(api_keys)
+
+    def limit(self, rate, capacity):
+        """Decorator to rate limit a route.
+
+        Args:
+            rate (float): Requests allowed per second on average.
+            capacity (int): Maximum burst of requests.
+
+        Returns:
+            function: Decorator for a route.
+        """
+
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                client = request.headers.get('X-API-Key')
+                if client not in self.api_keys:
+                    client = request.remote_addr
+
+                key = f'{request.endpoint}:{client}'
+                allowed, retry_after = self.backend.consume(key, rate, capacity)
+
+                if not allowed:
+                    error = TooManyRequests()
+                    error.retry_after = math.ceil(retry_after)
+                    raise error
+
+                return view(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
@@ -0,0 +1,41 @@
+import threading
+import time
+import weakref
+from .logs import logger
+
+
+# Seconds between refreshes picking up changes made by other processes.
+REFRESH_INTERVAL = 60.0
+
+_indexes = weakref.WeakSet()
+_refresher = None
+_refresher_lock = threading.Lock()
+
+
+def _refresh_all():
+    while True:
+        time.sleep(REFRESH_INTERVAL)
+        for index in list(_indexes):
+            try:
+                with index.app.app_context():
+                    index.refresh()
+            except Exception:
+                logger.exception('failed to refresh index')
+
+
+def refresh_in_background(index):
+    """Refreshes an index every REFRESH_INTERVAL seconds in a background
+    thread shared by all indexes, until the index is garbage collected.
+
+    Args:
+        index: Object with an app attribute and a refresh method reading
+        the app's database.
+    """
+
+    global _refresher
+
+    _indexes.add(index)
+    with _refresher_lock:
+        if _refresher is None:
+            _refresher = threading.Thread(target=_refresh_all, daemon=True)
+            _refresher.start()
@@ -0,0 +1,78 @@
+import hashlib
+
+
+FEISTEL_ROUNDS = 4
+
+
+def _round_function(value, seed, round_number, mask):
+    """Keyed round function used by each Feistel round.
+
+    Args:
+        value (int): Right half of the current block.
+        seed (int): Seed of the permutation.
+        round_number (int): Index of the current round.
+        mask (int): Bit mask of a half block.
+
+    Returns:
+        int: Pseudo-random value that fits within a half block.
+    """
+
+    digest = hashlib.blake2b(
+        f'{seed}:{round_number}:{value}'.encode(), digest_size=8).digest()
+
+    return int.from_bytes(digest, 'big') & mask
+
+
+def _feistel(value, seed, half_bits):
+    """Applies a balanced Feistel network to a value of 2 * half_bits bits.
+
+    Args:
+        value (int): Value to encrypt.
+        seed (int): Seed of the permutation.
+        half_bits (int): Number of bits in each half of the block.
+
+    Returns:
+        int: Permuted value within the same bit range.
+    """
+
+    mask = (1 << half_bits) - 1
+    left = value >> half_bits
+    right = value & mask
+
+    for round_number in range(FEISTEL_ROUNDS):
+        left, right = right, left ^ _round_function(
+            right, seed, round_number, mask)
+
+    return (left << half_bits) | right
+
+
+def permute(position, size, seed):
+    """Maps a position onto a pseudo-random index using a seeded permutation.
+
+    Every position in range(size) maps to a distinct index in range(size), so
+    walking positions 0..size-1 visits every index exactly once. Values that
+    fall outside of the range are walked back through the network (cycle
+    walking), which takes fewer than four steps on average.
+
+    Args:
+        position (int): Position within the permutation.
+        size (int): Number of elements being permuted.
+        seed (int): Seed of the permutation.
+
+    Returns:
+        int: Index in range(size) for the given position.
+
+    Raises:
+        ValueError: If position is not within range(size).
+    """
+
+    if not 0 <= position < size:
+        raise ValueError(f'position {position} is out of range for size {size}')
+
+    half_bits = max(1, ((size - 1).bit_length() + 1) // 2)
+
+    index = _feistel(position, seed, half_bits)
+    while index >= size:
+        index = _feistel(index, seed, half_bits)
+
+    return index
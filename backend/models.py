@@ -1,5 +1,5 @@
 import os
-from sqlalchemy import Column, String, Integer
+from sqlalchemy import Column, String, Integer, Index, UniqueConstraint
 from flask_sqlalchemy import SQLAlchemy
 
 database_name = 'trivia_test'
@@ -9,6 +9,50 @@ database_path = f"postgresql://{os.environ.get('DB_USER', 'postgres')}:{os.envir
 db = SQLAlchemy()
 
 
+def invalidate_cache():
+    """Invalidates the cached responses of the bound Flask application after
+    its data has changed.
+    """
+
+    cache = db.get_app().extensions.get('response_cache')
+    if cache is not None:
+        cache.invalidate()
+
+
+def update_question_index(question, deleted=False):
+    """Adds or removes a question in the duplicate index of the bound Flask
+    application.
+
+    Args:
+        question (Question): Inserted or deleted question.
+        deleted (bool, optional): Whether the question was deleted.
+    """
+
+    index = db.get_app().extensions.get('question_index')
+    if index is not None:
+        if deleted:
+            index.remove(question.id)
+        else:
+            index.add_question(question.id, question.question, question.signature)
+
+
+def update_known_answers(question, deleted=False):
+    """Adds or removes the answer of a question in the known answers of the
+    bound Flask application.
+
+    Args:
+        question (Question): Inserted or deleted question.
+        deleted (bool, optional): Whether the question was deleted.
+    """
+
+    answers = db.get_app().extensions.get('known_answers')
+    if answers is not None:
+        if deleted:
+            answers.remove_question(question.answer, question.answer_keys)
+        else:
+            answers.add_question(question.answer, question.answer_keys)
+
+
 def setup_db(app, database_path=database_path):
     """Binds a Flask application and a SQLAlchemy service.
 
@@ -33,23 +77,39 @@ class Question(db.Model):
     answer = Column(String, nullable=False)
     category = Column(String, nullable=False)
     difficulty = Column(Integer, nullable=False)
-
-    def __init__(self, question, answer, category, difficulty):
+    # NOTE: Normalized keys used to check answers, computed from the answer and
+    # its aliases. Null for questions that were added before this column.
+    answer_keys = Column(String, nullable=True)
+    # NOTE: MinHash signature used to detect near-duplicate questions. Null for
+    # questions that were added before this column.
+    signature = Column(String, nullable=True)
+
+    def __init__(self, question, answer, category, difficulty, answer_keys=None,
+                 signature=None):
         self.question = question
         self.answer = answer
         self.category = category
         self.difficulty = difficulty
+        self.answer_keys = answer_keys
+        self.signature = signature
 
     def insert(self):
         db.session.add(self)
         db.session.commit()
+        invalidate_cache()
+        update_question_index(self)
+        update_known_answers(self)
 
     def update(self):
         db.session.commit()
+        invalidate_cache()
 
     def delete(self):
         db.session.delete(self)
         db.session.commit()
+        invalidate_cache()
+        update_question_index(self, deleted=True)
+        update_known_answers(self, deleted=True)
 
     def to_json(self):
         return {
@@ -74,13 +134,53 @@ class Category(db.Model):
     def insert(self):
         db.session.add(self)
         db.session.commit()
+        invalidate_cache()
 
     def delete(self):
         db.session.delete(self)
         db.session.commit()
+        invalidate_cache()
 
     def to_json(self):
         return {
             'id': self.id,
             'type': self.type
         }
+
+
+class Score(db.Model):
+    __tablename__ = 'scores'
+    __table_args__ = (
+        UniqueConstraint('player', 'category'),
+        Index('ix_scores_category_score', 'category', 'score'),
+    )
+
+    # NOTE: Category 0 holds the total score of a player across all categories.
+    id = Column(Integer, primary_key=True)
+    player = Column(String, nullable=False)
+    category = Column(Integer, nullable=False)
+    score = Column(Integer, nullable=False, default=0)
+
+    def __init__(self, player, category, score=0):
+        self.player = player
+        self.category = category
+        self.score = score
+
+    def insert(self):
+        db.session.add(self)
+        db.session.commit()
+
+    def update(self):
+        db.session.commit()
+
+    def delete(self):
+        db.session.delete(self)
+        db.session.commit()
+
+    def to_json(self):
+        return {
+            'id': self.id,
+            'player': self.player,
+            'category': self.category,
+            'score': self.score
+        }
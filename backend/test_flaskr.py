@@ -1,11 +1,52 @@
+import io
 import os
 import json
+import logging
+import tempfile
+import threading
+import time
 import unittest
 from random import randint
+from flask import Flask, g, jsonify
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
 
-from flaskr import create_app
-from models import setup_db, Question, Category
+from flaskr import create_app, RESULTS_PER_PAGE
+from flaskr.answers import is_correct, make_answer_keys, within_distance
+from flaskr.cache import MemoryCacheBackend, FileCacheBackend, RedisCacheBackend
+from flaskr.coalesce import SingleFlight
+from flaskr.events import EventBroker
+from flaskr.leaderboard import Leaderboards, REFRESH_INTERVAL
+from flaskr.logs import AsyncJSONHandler
+from flaskr.ratelimit import MemoryRateLimitBackend, RateLimiter, SWEEP_INTERVAL
+from flaskr.refresh import REFRESH_INTERVAL as INDEX_REFRESH_INTERVAL
+from models import setup_db, db, Question, Category, Score
+
+
+class QueryCounter:
+    """Counts the SQL statements executed and rows fetched on an engine
+    while used as a context manager.
+
+    Rows are counted using the cursor's rowcount, which psycopg2 sets to the
+    number of rows returned by a SELECT.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+        self.rows = 0
+
+    def __enter__(self):
+        event.listen(self.engine, 'after_cursor_execute', self.count)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(self.engine, 'after_cursor_execute', self.count)
+
+    def count(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+        if cursor.description is not None and cursor.rowcount > 0:
+            self.rows += cursor.rowcount
 
 
 class TriviaTestCase(unittest.TestCase):
@@ -137,6 +178,9 @@ class TriviaTestCase(unittest.TestCase):
     def tearDown(self):
         """Executed after each test"""
 
+        # Writing the pending scores before cleaning up
+        self.app.extensions['leaderboards'].close()
+
         # Ensuring the DB is clean
         questions = Question.query.all()
         categories = Category.query.all()
@@ -146,6 +190,9 @@ class TriviaTestCase(unittest.TestCase):
         for category in categories:
             category.delete()
 
+        for score in Score.query.all():
+            score.delete()
+
     '''
     @ [DONE] TODO:
     Write at least one test for each test for successful operation and for expected errors.
@@ -161,6 +208,55 @@ class TriviaTestCase(unittest.TestCase):
         self.assertTrue(len(data['questions']))
         self.assertTrue(len(data['categories']))
 
+    def test_get_paginated_questions_from_cache(self):
+        res = self.client().get('/questions?page=1')
+        self.assertEqual(res.headers['X-Cache'], 'MISS')
+
+        res = self.client().get('/questions?page=1')
+        data = json.loads(res.data)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.headers['X-Cache'], 'HIT')
+        self.assertEqual(data['success'], True)
+        self.assertTrue(len(data['questions']))
+
+    def test_get_paginated_questions_after_cache_invalidation(self):
+        res = self.client().get('/questions?page=1')
+        total_questions = json.loads(res.data)['total_questions']
+
+        first_id = Category.query.order_by(Category.id.asc()).first()
+        question = Question(
+            question='Is the cache invalidated?',
+            answer='Yes it is',
+            difficulty=1,
+            category=first_id.id
+        )
+        question.insert()
+
+        res = self.client().get('/questions?page=1')
+        data = json.loads(res.data)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.headers['X-Cache'], 'MISS')
+        self.assertEqual(data['total_questions'], total_questions + 1)
+
+    def test_get_paginated_questions_with_fields(self):
+        res = self.client().get('/questions?fields=id,question')
+        data = json.loads(res.data)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(data['success'], True)
+        self.assertTrue(len(data['questions']))
+        self.assertEqual(set(data['questions'][0]), {'id', 'question'})
+
+    def test_400_get_paginated_questions_with_invalid_fields(self):
+        res = self.client().get('/questions?fields=id,password')
+        data = json.loads(res.data)
+
+        self.assertEqual(res.status_code, 400)
+        self.assertEqual(data['success'], False)
+        self.assertEqual(data['message'], 'bad request')
+
     def test_404_get_paginated_questions_with_invalid_page_number(self):
         res = self.client().get('/questions?page=1000')
         data = json.loads(res.data)
@@ -169,6 +265,14 @@ class TriviaTestCase(unittest.TestCase):
         self.assertEqual(data['success'], False)
         self.assertEqual(data['message'], 'not found')
 
+    def test_404_get_paginated_questions_with_page_below_one(self):
+        for page in (0, -1):
+            res = self.client().get(f'/questions?page={page}')
+            data = json.loads(res.data)
+
+            self.assertEqual(res.status_code, 404)
+            self.assertEqual(data['success'], False)
+
     def test_delete_question(self):
         first_id = Category.query.order_by(Category.id.asc()).first()
         last_id = Category.query.order_by(Category.id.desc()).first()
@@ -200,6 +304,27 @@ class TriviaTestCase(unittest.TestCase):
         self.assertEqual(data['success'], False)
         self.assertEqual(data['message'], 'not found')
 
+    def test_429_delete_question_when_rate_limited(self):
+        for _ in range(10):
+            res = self.client().delete('/questions/123155')
+            self.assertEqual(res.status_code, 404)
+
+        res = self.client().delete('/questions/123155')
+        data = json.loads(res.data)
+
+        self.assertEqual(res.status_code, 429)
+        self.assertEqual(data['success'], False)
+        self.assertEqual(data['message'], 'too many requests')
+        self.assertTrue(res.headers.get('Retry-After'))
+
+    def test_429_delete_question_with_unknown_api_keys(self):
+        for i in range(10):
+            self.client().delete('/questions/123155', headers={'X-API-Key': f'key-{i}'})
+
+        res = self.client().delete('/questions/123155', headers={'X-API-Key': 'key-10'})
+
+        self.assertEqual(res.status_code, 429)
+
     def test_create_question(self):
         first_id = Category.query.order_by(Category.id.asc()).first()
         last_id = Category.query.order_by(Category.id.desc()).first()
@@ -217,6 +342,125 @@ class TriviaTestCase(unittest.TestCase):
         self.assertEqual(data["success"], True)
         self.assertTrue(data["created"])
 
+    def test_stream_question_events(self):
+        res = self.client().get('/questions/stream', buffered=False)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.mimetype, 'text/event-stream')
+
+        # Subscribing happens once the stream is iterated.
+        events = (event.decode() if isinstance(event, bytes) else event
+                  for event in res.response)
+        next(events)
+
+        first_id = Category.query.order_by(Category.id.asc()).first()
+        request_body = {
+            'question': 'Is anybody listening?',
+            'answer': 'Yes',
+            'difficulty': 1,
+            'category': first_id.id
+        }
+        created = json.loads(self.client().post(
+            '/questions', json=request_body).data)['created']
+        self.client().delete(f'/questions/{created}')
+
+        created_event = next(events)
+        deleted_event = next(events)
+        res.close()
+
+        self.assertIn('event: created', created_event)
+        self.assertIn(f'"question_id": {created}', created_event)
+        self.assertIn('event: deleted', deleted_event)
+
+    def test_409_create_duplicate_question(self):
+        original = Question.query.filter(
+            Question.answer == 'Uruguay').one_or_none()
+        request_body = {
+            'question': 'Which country won the first soccer World Cup, in 1930?',
+            'answer': 'Uruguay',
+            'difficulty': 4,
+            'category': original.category
+        }
+
+        res = self.client().post('/questions', json=request_body)
+        data = json.loads(res.data)
+
+        self.assertEqual(res.status_code, 409)
+        self.assertEqual(data['success'], False)
+        self.assertEqual(data['message'], 'conflict')
+        self.assertEqual(data['duplicates'], [original.id])
+
+    def test_create_duplicate_question_when_allowed(self):
+        original = Question.query.filter(
+            Question.answer == 'Uruguay').one_or_none()
+        original_id = original.id
+        request_body = {
+            'question': 'Which country won the first soccer World Cup, in 1930?',
+            'answer': 'Uruguay',
+            'difficulty': 4,
+            'category': original.category,
+            'allow_duplicate': True
+        }
+
+        res = self.client().post('/questions', json=request_body)
+        created = json.loads(res.data)['created']
+        self.assertEqual(res.status_code, 200)
+
+        res = self.client().get('/questions/duplicates')
+        data = json.loads(res.data)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(data['success'], True)
+        self.assertIn([original_id, created],
+                      [duplicate['question_ids'] for duplicate in data['duplicates']])
+
+    def test_create_question_differing_in_one_word(self):
+        category_id = Category.query.order_by(Category.id.asc()).first().id
+        for first, second in (
+                ('In which year did World War I begin?',
+                 'In which year did World War II begin?'),
+                ('Which country won the FIFA World Cup in 1998?',
+                 'Which country won the FIFA World Cup in 2002?')):
+            for question in (first, second):
+                res = self.client().post('/questions', json={
+                    'question': question,
+                    'answer': 'Unknown',
+                    'difficulty': 2,
+                    'category': category_id
+                })
+
+                self.assertEqual(res.status_code, 200, question)
+
+    def test_create_question_after_duplicate_deleted_elsewhere(self):
+        # Deleting without the model hooks, as another process would.
+        Question.query.filter(Question.answer == 'Uruguay').delete()
+        db.session.commit()
+
+        # Run by the background refresh every REFRESH_INTERVAL seconds.
+        with self.app.app_context():
+            self.app.extensions['question_index'].refresh()
+
+        res = self.client().post('/questions', json={
+            'question': 'Which country won the first soccer World Cup, in 1930?',
+            'answer': 'Uruguay',
+            'difficulty': 4,
+            'category': 6
+        })
+
+        self.assertEqual(res.status_code, 200)
+
+    def test_backfill_signatures(self):
+        Question.query.update({Question.signature: None})
+        db.session.commit()
+
+        self.client().get('/questions/duplicates')
+        self.assertEqual(Question.query.filter(Question.signature.is_(None)).count(),
+                         Question.query.count())
+
+        result = self.app.test_cli_runner().invoke(args=['backfill-signatures'])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(Question.query.filter(Question.signature.is_(None)).count(), 0)
+
     def test_422_create_question_with_missing_field(self):
         first_id = Category.query.order_by(Category.id.asc()).first()
         last_id = Category.query.order_by(Category.id.desc()).first()
@@ -233,6 +477,141 @@ class TriviaTestCase(unittest.TestCase):
         self.assertEqual(data["success"], False)
         self.assertEqual(data["message"], "unprocessable")
 
+    def test_check_answer(self):
+        question = Question.query.filter(
+            Question.answer == 'The Palace of Versailles').one_or_none()
+
+        res = self.client().post(f'/questions/{question.id}/answer',
+                                 json={'answer': 'palace of versaille'})
+        data = json.loads(res.data)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(data['success'], True)
+        self.assertEqual(data['correct'], True)
+        self.assertEqual(data['answer'], 'The Palace of Versailles')
+
+    def test_check_answer_with_wrong_answer(self):
+        question = Question.query.filter(
+            Question.answer == 'Uruguay').one_or_none()
+
+        res = self.client().post(f'/questions/{question.id}/answer',
+                                 json={'answer': 'Brazil'})
+        data = json.loads(res.data)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(data['success'], True)
+        self.assertEqual(data['correct'], False)
+
+    def test_check_answer_with_alias(self):
+        first_id = Category.query.order_by(Category.id.asc()).first()
+        request_body = {
+            'question': 'Who painted the Mona Lisa?',
+            'answer': 'Leonardo da Vinci',
+            'aliases': ['Leonardo', 'da Vinci'],
+            'difficulty': 2,
+            'category': first_id.id
+        }
+        res = self.client().post('/questions', json=request_body)
+        question_id = json.loads(res.data)['created']
+
+        res = self.client().post(f'/questions/{question_id}/answer',
+                                 json={'answer': 'Da Vinci'})
+        data = json.loads(res.data)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(data['correct'], True)
+
+    def test_404_check_answer_with_invalid_id(self):
+        res = self.client().post('/questions/123155/answer',
+                                 json={'answer': 'Brazil'})
+        data = json.loads(res.data)
+
+        self.assertEqual(res.status_code, 404)
+        self.assertEqual(data['success'], False)
+        self.assertEqual(data['message'], 'not found')
+
+    def test_check_answer_with_other_known_answer(self):
+        category_id = Category.query.order_by(Category.id.asc()).first().id
+        question_ids = []
+        for question, answer in (('Which country has Bogota as its capital?', 'Colombia'),
+                                 ('Which river ends at Astoria, Oregon?', 'Columbia')):
+            res = self.client().post('/questions', json={
+                'question': question,
+                'answer': answer,
+                'difficulty': 2,
+                'category': category_id
+            })
+            question_ids.append(json.loads(res.data)['created'])
+
+        res = self.client().post(f'/questions/{question_ids[0]}/answer',
+                                 json={'answer': 'Columbia'})
+        data = json.loads(res.data)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(data['correct'], False)
+
+        res = self.client().post(f'/questions/{question_ids[0]}/answer',
+                                 json={'answer': 'Colonbia'})
+        data = json.loads(res.data)
+
+        self.assertEqual(data['correct'], True)
+
+    def test_check_answer_with_legacy_known_answer(self):
+        category_id = Category.query.order_by(Category.id.asc()).first().id
+        db.session.add(Question(question='Which river ends at Astoria, Oregon?',
+                                answer='Columbia', category=category_id, difficulty=2))
+        db.session.commit()
+        self.app.extensions['known_answers'].refresh()
+
+        res = self.client().post('/questions', json={
+            'question': 'Which country has Bogota as its capital?',
+            'answer': 'Colombia',
+            'difficulty': 2,
+            'category': category_id
+        })
+        question_id = json.loads(res.data)['created']
+
+        res = self.client().post(f'/questions/{question_id}/answer',
+                                 json={'answer': 'Columbia'})
+        data = json.loads(res.data)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(data['correct'], False)
+
+    def test_backfill_answer_keys(self):
+        Question.query.update({Question.answer_keys: None})
+        db.session.commit()
+
+        result = self.app.test_cli_runner().invoke(args=['backfill-answer-keys'])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(Question.query.filter(Question.answer_keys.is_(None)).count(), 0)
+
+    def test_422_create_question_with_separator_in_alias(self):
+        first_id = Category.query.order_by(Category.id.asc()).first()
+        request_body = {
+            'question': 'Which band released Back in Black?',
+            'answer': 'AC/DC',
+            'aliases': ['AC|DC'],
+            'difficulty': 2,
+            'category': first_id.id
+        }
+        res = self.client().post('/questions', json=request_body)
+        data = json.loads(res.data)
+
+        self.assertEqual(res.status_code, 422)
+        self.assertEqual(data['success'], False)
+
+    def test_422_check_answer_with_missing_answer(self):
+        question = Question.query.first()
+
+        res = self.client().post(f'/questions/{question.id}/answer', json={})
+        data = json.loads(res.data)
+
+        self.assertEqual(res.status_code, 422)
+        self.assertEqual(data['success'], False)
+        self.assertEqual(data['message'], 'unprocessable')
+
     def test_search_questions(self):
         request_body = {'searchTerm': 'a'}
         res = self.client().post('/questions/search', json=request_body)
@@ -275,6 +654,63 @@ class TriviaTestCase(unittest.TestCase):
         self.assertEqual(res.status_code, 200)
         self.assertEqual(data['success'], True)
 
+    def test_play_quiz_without_answer(self):
+        request_body = {'previous_questions': [],
+                        'quiz_category': {'type': 'click', 'id': 0},
+                        'fields': ['id', 'question', 'category', 'difficulty']}
+
+        res = self.client().post('/quizzes', json=request_body)
+        data = json.loads(res.data)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(data['success'], True)
+        self.assertNotIn('answer', data['question'])
+
+    def test_play_quiz_in_batch(self):
+        total_questions = len(Question.query.all())
+        request_body = {'previous_questions': [],
+                        'quiz_category': {'type': 'click', 'id': 0},
+                        'count': 5}
+
+        res = self.client().post('/quizzes', json=request_body)
+        data = json.loads(res.data)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(data['success'], True)
+        self.assertEqual(len(data['questions']), 5)
+        self.assertEqual(len({question['id'] for question in data['questions']}), 5)
+        self.assertEqual(data['question'], data['questions'][0])
+        self.assertEqual(data['remaining_questions'], total_questions - 5)
+
+    def test_play_seeded_quiz_in_batch(self):
+        request_body = {'quiz_category': {'type': 'click', 'id': 0},
+                        'seed': 1234,
+                        'position': 2,
+                        'count': 3}
+        res = self.client().post('/quizzes', json=request_body)
+        data = json.loads(res.data)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(data['questions']), 3)
+
+        for offset, question in enumerate(data['questions']):
+            request_body = {'quiz_category': {'type': 'click', 'id': 0},
+                            'seed': 1234,
+                            'position': 2 + offset}
+            res = self.client().post('/quizzes', json=request_body)
+            self.assertEqual(json.loads(res.data)['question'], question)
+
+    def test_422_play_quiz_with_invalid_count(self):
+        request_body = {'previous_questions': [],
+                        'quiz_category': {'type': 'click', 'id': 0},
+                        'count': 1000}
+        res = self.client().post('/quizzes', json=request_body)
+        data = json.loads(res.data)
+
+        self.assertEqual(res.status_code, 422)
+        self.assertEqual(data["success"], False)
+        self.assertEqual(data["message"], "unprocessable")
+
     def test_422_play_quiz_with_missing_quiz_category(self):
         request_body = {'previous_questions': []}
         res = self.client().post('/quizzes', json=request_body)
@@ -284,6 +720,72 @@ class TriviaTestCase(unittest.TestCase):
         self.assertEqual(data["success"], False)
         self.assertEqual(data["message"], "unprocessable")
 
+    def test_422_play_quiz_with_invalid_previous_questions(self):
+        for previous_questions in (['a'], [1.5], 'a'):
+            request_body = {'previous_questions': previous_questions,
+                            'quiz_category': {'type': 'click', 'id': 0}}
+            res = self.client().post('/quizzes', json=request_body)
+            data = json.loads(res.data)
+
+            self.assertEqual(res.status_code, 422)
+            self.assertEqual(data["success"], False)
+
+    def test_play_seeded_quiz(self):
+        seen_ids = []
+        for position in range(len(Question.query.all())):
+            request_body = {'quiz_category': {'type': 'click', 'id': 0},
+                            'seed': 1234,
+                            'position': position}
+            res = self.client().post('/quizzes', json=request_body)
+            data = json.loads(res.data)
+
+            self.assertEqual(res.status_code, 200)
+            self.assertEqual(data['success'], True)
+            self.assertEqual(data['position'], position)
+            seen_ids.append(data['question']['id'])
+
+        self.assertEqual(len(seen_ids), len(set(seen_ids)))
+
+        request_body = {'quiz_category': {'type': 'click', 'id': 0},
+                        'seed': 1234,
+                        'position': len(seen_ids)}
+        res = self.client().post('/quizzes', json=request_body)
+        data = json.loads(res.data)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(data['question'], None)
+
+    def test_409_play_seeded_quiz_after_questions_changed(self):
+        request_body = {'quiz_category': {'type': 'click', 'id': 0},
+                        'seed': 1234,
+                        'position': 0}
+        res = self.client().post('/quizzes', json=request_body)
+        version = json.loads(res.data)['version']
+
+        request_body['position'] = 1
+        request_body['version'] = version
+        res = self.client().post('/quizzes', json=request_body)
+        self.assertEqual(res.status_code, 200)
+
+        Question.query.first().delete()
+
+        res = self.client().post('/quizzes', json=request_body)
+        data = json.loads(res.data)
+
+        self.assertEqual(res.status_code, 409)
+        self.assertEqual(data["success"], False)
+
+    def test_422_play_seeded_quiz_with_invalid_position(self):
+        request_body = {'quiz_category': {'type': 'click', 'id': 0},
+                        'seed': 1234,
+                        'position': -1}
+        res = self.client().post('/quizzes', json=request_body)
+        data = json.loads(res.data)
+
+        self.assertEqual(res.status_code, 422)
+        self.assertEqual(data["success"], False)
+        self.assertEqual(data["message"], "unprocessable")
+
     def test_get_questions_by_category(self):
         first_id = Category.query.order_by(Category.id.asc()).first()
         last_id = Category.query.order_by(Category.id.desc()).first()
@@ -306,6 +808,223 @@ class TriviaTestCase(unittest.TestCase):
         self.assertEqual(data["success"], False)
         self.assertEqual(data["message"], "not found")
 
+    def test_add_score(self):
+        category_id = Category.query.order_by(Category.id.asc()).first().id
+        request_body = {'player': 'alice',
+                        'quiz_category': {'type': 'Science', 'id': category_id},
+                        'score': 3}
+        res = self.client().post('/scores', json=request_body)
+        data = json.loads(res.data)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(data['success'], True)
+        self.assertEqual(data['score'], 3)
+        self.assertEqual(data['rank'], 1)
+
+        self.app.extensions['leaderboards'].close()
+        score = Score.query.filter(Score.player == 'alice',
+                                   Score.category == category_id).one_or_none()
+
+        self.assertEqual(score.score, 3)
+
+    def test_leaderboard_reload_keeps_pending_scores(self):
+        category_id = Category.query.order_by(Category.id.asc()).first().id
+        now = [0.0]
+        leaderboards = Leaderboards(clock=lambda: now[0])
+
+        with self.app.app_context():
+            leaderboards.add_score('alice', category_id, 3)
+
+            # Written by another process
+            Score('bob', category_id, 7).insert()
+
+            now[0] = REFRESH_INTERVAL + 1
+            self.assertEqual(leaderboards.top(category_id, 10),
+                             [('bob', 7), ('alice', 3)])
+
+    def test_leaderboard_flusher_only_runs_with_pending_scores(self):
+        category_id = Category.query.order_by(Category.id.asc()).first().id
+        leaderboards = self.app.extensions['leaderboards']
+        self.assertIsNone(leaderboards.flusher)
+
+        self.client().post('/scores', json={
+            'player': 'alice',
+            'quiz_category': {'type': 'Science', 'id': category_id},
+            'score': 3})
+
+        self.assertTrue(leaderboards.flusher.is_alive())
+
+    def test_422_add_score_with_invalid_category(self):
+        for category_id in ('Science', 123155):
+            request_body = {'player': 'alice',
+                            'quiz_category': {'type': 'Science', 'id': category_id},
+                            'score': 3}
+            res = self.client().post('/scores', json=request_body)
+            data = json.loads(res.data)
+
+            self.assertEqual(res.status_code, 422)
+            self.assertEqual(data['success'], False)
+
+    def test_422_add_score_with_missing_player(self):
+        request_body = {'quiz_category': {'type': 'Science', 'id': 1},
+                        'score': 3}
+        res = self.client().post('/scores', json=request_body)
+        data = json.loads(res.data)
+
+        self.assertEqual(res.status_code, 422)
+        self.assertEqual(data['success'], False)
+        self.assertEqual(data['message'], 'unprocessable')
+
+    def test_get_leaderboard(self):
+        category_id = Category.query.order_by(Category.id.asc()).first().id
+        for player, score in [('alice', 3), ('bob', 5), ('alice', 1)]:
+            self.client().post('/scores', json={
+                'player': player,
+                'quiz_category': {'type': 'Science', 'id': category_id},
+                'score': score})
+
+        res = self.client().get(f'/leaderboards/{category_id}')
+        data = json.loads(res.data)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(data['success'], True)
+        self.assertEqual(data['players'], [{'player': 'bob', 'score': 5},
+                                           {'player': 'alice', 'score': 4}])
+
+        res = self.client().get('/leaderboards/0/players/alice')
+        data = json.loads(res.data)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(data['score'], 4)
+        self.assertEqual(data['rank'], 2)
+
+    def test_404_get_player_rank_without_score(self):
+        category_id = Category.query.order_by(Category.id.asc()).first().id
+        res = self.client().get(f'/leaderboards/{category_id}/players/nobody')
+        data = json.loads(res.data)
+
+        self.assertEqual(res.status_code, 404)
+        self.assertEqual(data['success'], False)
+        self.assertEqual(data['message'], 'not found')
+
+    def test_404_get_leaderboard_of_invalid_category(self):
+        res = self.client().get('/leaderboards/123155')
+        data = json.loads(res.data)
+
+        self.assertEqual(res.status_code, 404)
+        self.assertEqual(data['success'], False)
+        self.assertNotIn(123155, self.app.extensions['leaderboards'].boards)
+
+    def test_query_budgets(self):
+        # Growing the table to make sure no route's queries scale with it.
+        category_id = Category.query.order_by(Category.id.asc()).first().id
+        for i in range(3 * RESULTS_PER_PAGE):
+            Question(question=f'Filler question {i}?', answer='Filler',
+                     difficulty=1, category=category_id).insert()
+
+        # An index due for a refresh must not refresh on the request path.
+        question_index = self.app.extensions['question_index']
+        question_index.refreshed = question_index.clock() - 2 * INDEX_REFRESH_INTERVAL
+
+        total_categories = Category.query.count()
+        question_id = Question.query.first().id
+        engine = db.get_engine(self.app)
+
+        # (rule, method, url, body, max statements, max rows)
+        budgets = [
+            ('/categories', 'GET', '/categories', None,
+             1, total_categories),
+            ('/questions/duplicates', 'GET', '/questions/duplicates', None,
+             1, Question.query.count()),
+            ('/questions', 'GET', '/questions', None,
+             3, RESULTS_PER_PAGE + 1 + total_categories),
+            ('/questions', 'POST', '/questions',
+             {'question': 'Budget?', 'answer': 'Tight', 'difficulty': 1, 'category': category_id},
+             2, 1),
+            ('/questions/search', 'POST', '/questions/search', {'searchTerm': 'Filler'},
+             2, RESULTS_PER_PAGE + 1),
+            ('/categories/<int:category_id>/questions', 'GET', f'/categories/{category_id}/questions', None,
+             2, RESULTS_PER_PAGE + 1),
+            ('/quizzes', 'POST', '/quizzes',
+             {'previous_questions': [question_id], 'quiz_category': {'type': 'click', 'id': 0}},
+             1, 1),
+            ('/quizzes', 'POST', '/quizzes',
+             {'quiz_category': {'type': 'click', 'id': 0}, 'seed': 1, 'position': 0},
+             2, 2),
+            ('/quizzes', 'POST', '/quizzes',
+             {'previous_questions': [], 'quiz_category': {'type': 'click', 'id': 0}, 'count': 5},
+             1, 5),
+            ('/quizzes', 'POST', '/quizzes',
+             {'quiz_category': {'type': 'click', 'id': 0}, 'seed': 1, 'position': 0, 'count': 5},
+             2, 1 + 5),
+            ('/questions/<int:question_id>/answer', 'POST', f'/questions/{question_id}/answer', {'answer': 'Filler'},
+             1, 1),
+            ('/questions/<int:question_id>', 'DELETE', f'/questions/{question_id}', None,
+             2, 1),
+            ('/scores', 'POST', '/scores',
+             {'player': 'alice', 'quiz_category': {'type': 'click', 'id': category_id}, 'score': 1},
+             2, 2),
+            ('/leaderboards/<int:category_id>', 'GET', f'/leaderboards/{category_id}', None,
+             1, 1),
+            ('/leaderboards/<int:category_id>/players/<player>', 'GET', f'/leaderboards/{category_id}/players/alice', None,
+             1, 1),
+            ('/questions/stream', 'GET', '/questions/stream', None,
+             0, 0),
+        ]
+
+        for rule, method, url, body, max_statements, max_rows in budgets:
+            with QueryCounter(engine) as counter:
+                res = self.client().open(url, method=method, json=body)
+                res.close()
+
+            self.assertEqual(res.status_code, 200, f'{method} {url}')
+            self.assertLessEqual(len(counter.statements), max_statements,
+                                 f'{method} {url}: {counter.statements}')
+            self.assertLessEqual(counter.rows, max_rows, f'{method} {url}')
+
+        rules = {rule.rule for rule in self.app.url_map.iter_rules()
+                 if rule.endpoint != 'static'}
+        self.assertEqual(rules, {budget[0] for budget in budgets})
+
+    def test_request_id(self):
+        res = self.client().get('/categories', headers={'X-Request-ID': 'abc123'})
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.headers['X-Request-ID'], 'abc123')
+
+        res = self.client().get('/categories')
+        self.assertTrue(res.headers['X-Request-ID'])
+
+    def test_access_log(self):
+        stream = io.StringIO()
+        handler = AsyncJSONHandler(stream)
+        logger = logging.getLogger('flaskr')
+        logger.addHandler(handler)
+        try:
+            self.client().get('/questions?page=1', headers={'X-Request-ID': 'abc123'})
+        finally:
+            logger.removeHandler(handler)
+            handler.close()
+
+        entries = [json.loads(line) for line in stream.getvalue().splitlines()]
+        entry = [entry for entry in entries if entry['request_id'] == 'abc123'][0]
+
+        self.assertEqual(entry['message'], 'access')
+        self.assertEqual(entry['route'], '/questions')
+        self.assertEqual(entry['method'], 'GET')
+        self.assertEqual(entry['status'], 200)
+        self.assertGreaterEqual(entry['latency_ms'], entry['db_ms'])
+        self.assertGreater(entry['db_ms'], 0)
+
+    def test_db_time_of_failed_statement(self):
+        with self.app.test_request_context():
+            g.db_time = 0.0
+            with self.assertRaises(Exception):
+                db.session.execute('SELECT * FROM missing_table')
+            db.session.rollback()
+
+            self.assertGreater(g.db_time, 0)
+
     def test_get_categories(self):
         res = self.client().get('/categories')
         data = json.loads(res.data)
@@ -331,6 +1050,220 @@ class TriviaTestCase(unittest.TestCase):
         self.assertEqual(data['message'], 'not found')
 
 
+class RateLimitTestCase(unittest.TestCase):
+    """This class represents the rate limiting and request coalescing test case"""
+
+    def test_memory_backend_removes_refilled_buckets(self):
+        now = [0.0]
+        backend = MemoryRateLimitBackend(clock=lambda: now[0])
+        backend.consume('idle', 1, 10)
+        backend.consume('busy', 0.001, 10)
+
+        now[0] = SWEEP_INTERVAL
+        backend.consume('other', 1, 10)
+
+        self.assertNotIn('idle', backend.buckets)
+        self.assertIn('busy', backend.buckets)
+
+    def test_rate_limiter_only_honours_known_api_keys(self):
+        app = Flask(__name__)
+        limiter = RateLimiter(api_keys=['known'])
+
+        @app.route('/')
+        @limiter.limit(1, 1)
+        def index():
+            return 'ok'
+
+        client = app.test_client()
+
+        self.assertEqual(client.get('/', headers={'X-API-Key': 'unknown'}).status_code, 200)
+        self.assertEqual(client.get('/', headers={'X-API-Key': 'other'}).status_code, 429)
+        self.assertEqual(client.get('/', headers={'X-API-Key': 'known'}).status_code, 200)
+
+    def test_single_flight_runs_concurrent_requests_once(self):
+        app = Flask(__name__)
+        single_flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        @app.route('/slow')
+        @single_flight.coalesce
+        def slow():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return jsonify({'call': len(calls)})
+
+        bodies = []
+
+        def get():
+            bodies.append(app.test_client().get('/slow').get_data())
+
+        threads = [threading.Thread(target=get) for _ in range(8)]
+        threads[0].start()
+        started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+
+        # Giving the other requests time to find the call in flight.
+        time.sleep(0.5)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(bodies), 8)
+        self.assertEqual(set(bodies), {bodies[0]})
+
+
+class EventBrokerTestCase(unittest.TestCase):
+    """This class represents the question events test case"""
+
+    def test_stream_ends_after_lifetime(self):
+        broker = EventBroker()
+        messages = list(broker.stream(heartbeat_interval=0.01, lifetime=0.05))
+
+        self.assertTrue(messages[0].startswith('retry: '))
+        self.assertEqual(broker.subscriptions, set())
+
+    def test_stream_only_subscribes_when_iterated(self):
+        broker = EventBroker()
+        stream = broker.stream()
+        self.assertEqual(broker.subscriptions, set())
+
+        next(stream)
+        self.assertEqual(len(broker.subscriptions), 1)
+
+        stream.close()
+        self.assertEqual(broker.subscriptions, set())
+
+    def test_stream_resets_client_that_missed_events(self):
+        broker = EventBroker()
+        broker.publish('created', question_id=1, category=1)
+
+        stream = broker.stream(last_event_id='1')
+        self.assertIn('id: 1', next(stream))
+        stream.close()
+
+        broker.publish('deleted', question_id=1, category=1)
+
+        stream = broker.stream(last_event_id='1')
+        next(stream)
+        self.assertIn('event: reset', next(stream))
+        stream.close()
+
+
+class FakeRedis:
+    """Dict-backed stand-in for the Redis client methods used by the cache."""
+
+    def __init__(self):
+        self.values = {}
+        self.expiry = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+        self.expiry[key] = ex
+
+    def incr(self, key):
+        self.values[key] = int(self.values.get(key, 0)) + 1
+        return self.values[key]
+
+
+class CacheBackendTestCase(unittest.TestCase):
+    """This class represents the response cache backends test case"""
+
+    def test_memory_backend_evicts_least_recently_used(self):
+        backend = MemoryCacheBackend(max_bytes=10)
+        backend.set('first', b'1234')
+        backend.set('second', b'1234')
+        backend.get('first')
+        backend.set('third', b'1234')
+
+        self.assertEqual(backend.get('first'), b'1234')
+        self.assertIsNone(backend.get('second'))
+        self.assertEqual(backend.get('third'), b'1234')
+        self.assertEqual(backend.size, 8)
+
+    def test_memory_backend_expires_entries(self):
+        now = [0.0]
+        backend = MemoryCacheBackend(ttl=10.0, clock=lambda: now[0])
+        backend.set('key', b'value')
+
+        now[0] = 9.0
+        self.assertEqual(backend.get('key'), b'value')
+
+        now[0] = 10.0
+        self.assertIsNone(backend.get('key'))
+        self.assertEqual(backend.size, 0)
+
+    def test_file_backend_is_shared_between_instances(self):
+        with tempfile.TemporaryDirectory() as directory:
+            first = FileCacheBackend(directory)
+            second = FileCacheBackend(directory)
+
+            first.set('key', b'value')
+            self.assertEqual(second.get('key'), b'value')
+
+            second.bump_version()
+            self.assertEqual(first.version(), 1)
+            self.assertIsNone(first.get('key'))
+
+    def test_redis_backend(self):
+        client = FakeRedis()
+        backend = RedisCacheBackend(client, ttl=60)
+
+        backend.set('key', b'value')
+        self.assertEqual(backend.get('key'), b'value')
+        self.assertEqual(client.expiry['trivia:cache:key'], 60)
+
+        self.assertEqual(backend.version(), 0)
+        backend.bump_version()
+        self.assertEqual(RedisCacheBackend(client).version(), 1)
+
+
+class AnswersTestCase(unittest.TestCase):
+    """This class represents the answer matching test case"""
+
+    def test_within_distance(self):
+        self.assertTrue(within_distance('versailles', 'versaille', 1))
+        self.assertTrue(within_distance('versailles', 'versales', 2))
+        self.assertFalse(within_distance('versailles', 'versales', 1))
+        self.assertFalse(within_distance('australia', 'austria', 1))
+
+    def test_is_correct(self):
+        answer_keys = make_answer_keys('The Palace of Versailles')
+
+        self.assertTrue(is_correct('palace of versailles', answer_keys))
+        self.assertTrue(is_correct('the Palace of Versaille', answer_keys))
+        self.assertTrue(is_correct('Palace of Versales', answer_keys))
+        self.assertTrue(is_correct('Paris', make_answer_keys('Paris')))
+        self.assertTrue(is_correct('Pairs', make_answer_keys('Paris')))
+
+    def test_is_correct_with_other_words(self):
+        for guess, answer in (('Austria', 'Australia'),
+                              ('Zambia', 'Gambia'),
+                              ('Parts', 'Paris'),
+                              ('Hungry', 'Hungary'),
+                              ('12346', '12345'),
+                              ('Apollo 12', 'Apollo 11')):
+            self.assertFalse(is_correct(guess, make_answer_keys(answer)), guess)
+
+    def test_is_correct_with_known_answer(self):
+        answer_keys = make_answer_keys('Muhammad Ali')
+
+        self.assertTrue(is_correct('Muhamad Ali', answer_keys))
+        self.assertFalse(is_correct('Muhamad Ali', answer_keys,
+                                    lambda guess: guess == 'muhamad ali'))
+
+    def test_make_answer_keys_with_separator(self):
+        with self.assertRaises(ValueError):
+            make_answer_keys('AC/DC', ['AC|DC'])
+
+
 # Make the tests conveniently executable
 if __name__ == "__main__":
     unittest.main()
@@ -14,11 +14,65 @@ class QuestionView extends Component {
       totalQuestions: 0,
       categories: {},
       currentCategory: null,
+      searchTerm: null,
     }
   }
 
   componentDidMount() {
     this.getQuestions();
+
+    this.events = new EventSource('/questions/stream');
+    this.events.addEventListener('created', this.handleCreated);
+    this.events.addEventListener('deleted', this.handleDeleted);
+    this.events.addEventListener('reset', () => this.refresh());
+  }
+
+  componentWillUnmount() {
+    this.events.close();
+  }
+
+  isInView = (category) => {
+    // Whether search results include a question is unknown, so events are
+    // only applied to the list of all questions or of a category.
+    const { currentCategory, searchTerm } = this.state
+    return searchTerm === null &&
+      (currentCategory === null || String(currentCategory) === String(category))
+  }
+
+  refresh = () => {
+    if (this.state.currentCategory === null) {
+      this.getQuestions();
+    } else {
+      this.getByCategory(this.state.currentCategory);
+    }
+  }
+
+  handleCreated = (event) => {
+    const { category } = JSON.parse(event.data)
+    if (!this.isInView(category)) {
+      return;
+    }
+
+    // New questions are added to the end of the last page, so only a last
+    // page that is not full needs to be re-fetched.
+    if (this.state.questions.length < 10) {
+      this.refresh();
+    } else {
+      this.setState({ totalQuestions: this.state.totalQuestions + 1 })
+    }
+  }
+
+  handleDeleted = (event) => {
+    const { question_id, category } = JSON.parse(event.data)
+    const questions = this.state.questions.filter(question => question.id !== question_id)
+    if (questions.length === this.state.questions.length && !this.isInView(category)) {
+      return;
+    }
+
+    this.setState({
+      questions: questions,
+      totalQuestions: this.state.totalQuestions - 1
+    })
   }
 
   getQuestions = () => {
@@ -30,7 +84,8 @@ class QuestionView extends Component {
           questions: result.questions,
           totalQuestions: result.total_questions,
           categories: result.categories,
-          currentCategory: result.current_category
+          currentCategory: result.current_category,
+          searchTerm: null
         })
         return;
       },
@@ -67,7 +122,8 @@ class QuestionView extends Component {
         this.setState({
           questions: result.questions,
           totalQuestions: result.total_questions,
-          currentCategory: result.current_category
+          currentCategory: result.current_category,
+          searchTerm: null
         })
         return;
       },
@@ -93,7 +149,8 @@ class QuestionView extends Component {
         this.setState({
           questions: result.questions,
           totalQuestions: result.total_questions,
-          currentCategory: result.current_category
+          currentCategory: result.current_category,
+          searchTerm: searchTerm
         })
         return;
       },
@@ -111,6 +168,8 @@ class QuestionView extends Component {
           url: `/questions/${id}`, // [DONE] TODO: update request URL
           type: "DELETE",
           success: (result) => {
+            // Also sent as a 'deleted' event, but only to clients connected
+            // to the same process and while the stream is open.
             this.getQuestions();
           },
           error: (error) => {
@@ -15,7 +15,10 @@ class QuizView extends Component {
         categories: {},
         numCorrect: 0,
         currentQuestion: {},
+        upcomingQuestions: [],
         guess: '',
+        correct: false,
+        answer: '',
         forceEnd: false
     }
   }
@@ -47,6 +50,20 @@ class QuizView extends Component {
     const previousQuestions = [...this.state.previousQuestions]
     if(this.state.currentQuestion.id) { previousQuestions.push(this.state.currentQuestion.id) }
 
+    // The whole round is fetched at once, so only go back to the server once
+    // the fetched questions have all been played.
+    if(this.state.upcomingQuestions.length) {
+      const [nextQuestion, ...upcomingQuestions] = this.state.upcomingQuestions
+      this.setState({
+        showAnswer: false,
+        previousQuestions: previousQuestions,
+        currentQuestion: nextQuestion,
+        upcomingQuestions: upcomingQuestions,
+        guess: ''
+      })
+      return;
+    }
+
     $.ajax({
       url: '/quizzes', // [DONE] TODO: update request URL
       type: "POST",
@@ -54,19 +71,23 @@ class QuizView extends Component {
       contentType: 'application/json',
       data: JSON.stringify({
         previous_questions: previousQuestions,
-        quiz_category: this.state.quizCategory
+        quiz_category: this.state.quizCategory,
+        fields: ['id', 'question', 'category', 'difficulty'],
+        count: Math.max(questionsPerPlay - previousQuestions.length, 1)
       }),
       xhrFields: {
         withCredentials: true
       },
       crossDomain: true,
       success: (result) => {
+        const [nextQuestion, ...upcomingQuestions] = result.questions
         this.setState({
           showAnswer: false,
           previousQuestions: previousQuestions,
-          currentQuestion: result.question,
+          currentQuestion: nextQuestion || {},
+          upcomingQuestions: upcomingQuestions,
           guess: '',
-          forceEnd: result.question ? false : true
+          forceEnd: nextQuestion ? false : true
         })
         return;
       },
@@ -79,11 +100,31 @@ class QuizView extends Component {
 
   submitGuess = (event) => {
     event.preventDefault();
-    const formatGuess = this.state.guess.replace(/[.,\/#!$%\^&\*;:{}=\-_`~()]/g,"").toLowerCase()
-    let evaluate =  this.evaluateAnswer()
-    this.setState({
-      numCorrect: !evaluate ? this.state.numCorrect : this.state.numCorrect + 1,
-      showAnswer: true,
+    $.ajax({
+      url: `/questions/${this.state.currentQuestion.id}/answer`,
+      type: "POST",
+      dataType: 'json',
+      contentType: 'application/json',
+      data: JSON.stringify({
+        answer: this.state.guess
+      }),
+      xhrFields: {
+        withCredentials: true
+      },
+      crossDomain: true,
+      success: (result) => {
+        this.setState({
+          numCorrect: !result.correct ? this.state.numCorrect : this.state.numCorrect + 1,
+          correct: result.correct,
+          answer: result.answer,
+          showAnswer: true,
+        })
+        return;
+      },
+      error: (error) => {
+        alert('Unable to check answer. Please try your request again')
+        return;
+      }
     })
   }
 
@@ -94,7 +135,10 @@ class QuizView extends Component {
       showAnswer: false,
       numCorrect: 0,
       currentQuestion: {},
+      upcomingQuestions: [],
       guess: '',
+      correct: false,
+      answer: '',
       forceEnd: false
     })
   }
@@ -130,20 +174,13 @@ class QuizView extends Component {
     )
   }
 
-  evaluateAnswer = () => {
-    const formatGuess = this.state.guess.replace(/[.,\/#!$%\^&\*;:{}=\-_`~()]/g,"").toLowerCase()
-    const answerArray = this.state.currentQuestion.answer.toLowerCase().split(' ');
-    return answerArray.every(el => formatGuess.includes(el));
-  }
-
   renderCorrectAnswer(){
-    const formatGuess = this.state.guess.replace(/[.,\/#!$%\^&\*;:{}=\-_`~()]/g,"").toLowerCase()
-    let evaluate =  this.evaluateAnswer()
+    let evaluate = this.state.correct
     return(
       <div className="quiz-play-holder">
         <div className="quiz-question">{this.state.currentQuestion.question}</div>
         <div className={`${evaluate ? 'correct' : 'wrong'}`}>{evaluate ? "You were correct!" : "You were incorrect"}</div>
-        <div className="quiz-answer">{this.state.currentQuestion.answer}</div>
+        <div className="quiz-answer">{this.state.answer}</div>
         <div className="next-question button" onClick={this.getNextQuestion}> Next Question </div>
       </div>
     )